@@ -1,11 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
-import zipfile
-from io import BytesIO
 
-from reports.workbook_builder import build_brand_workbook
-from reports.branch_summary_workbook import build_branch_summary_workbook
-from core.deals_engine import load_deals_by_mode, normalize_brand_name
+from pipeline import MODES, PAYOUT_CYCLES, zip_file_name
+from report_jobs import start_job, get_job, RUNNING, DONE, FAILED, CANCELLED
+from core.run_metrics import SLOWEST_BRANDS
+
+# Seconds between progress refreshes of a running job
+POLL_SECONDS = 1.0
 
 
 st.set_page_config(
@@ -18,46 +20,28 @@ st.title("Slot-X Sales & Inventory Reports")
 
 
 # =========================================================
-# REFUND REMOVAL (OLD LOGIC EXACTLY)
+# MODE
 # =========================================================
 
-def remove_refunds_and_original_sales(sales_df):
-
-    if "quantity" not in sales_df.columns or "barcode" not in sales_df.columns:
-        return sales_df
-
-    sales_df = sales_df.copy()
-
-    refunds = sales_df[sales_df["quantity"] < 0]
-
-    if refunds.empty:
-        return sales_df
-
-    indices_to_remove = set(refunds.index.tolist())
-
-    for idx, refund_row in refunds.iterrows():
-        barcode = refund_row["barcode"]
-        refund_qty = abs(refund_row["quantity"])
-        brand = refund_row["brand"]
+mode = st.selectbox("Select Mode", MODES)
+payout_cycle = st.selectbox("Select Payout Cycle", PAYOUT_CYCLES)
 
-        matching_sales = sales_df[
-            (sales_df["barcode"] == barcode) &
-            (sales_df["brand"] == brand) &
-            (sales_df["quantity"] == refund_qty)
-        ]
+cpu_count = os.cpu_count() or 1
 
-        if not matching_sales.empty:
-            indices_to_remove.add(matching_sales.index[0])
-
-    return sales_df.drop(index=indices_to_remove)
-
-
-# =========================================================
-# MODE
-# =========================================================
+max_workers = st.number_input(
+    "Parallel Workers",
+    min_value=1,
+    max_value=cpu_count,
+    value=min(4, cpu_count),
+    help="1 = build brand workbooks one after another"
+)
 
-mode = st.selectbox("Select Mode", ["Zamalek", "Alexandria", "Merged"])
-payout_cycle = st.selectbox("Select Payout Cycle", ["Cycle 1", "Cycle 2"])
+use_workbook_cache = st.checkbox(
+    "Reuse workbooks of unchanged brands",
+    value=True,
+    help="Brands whose sales, inventory and deal are identical to an "
+         "earlier run are taken from the local cache instead of rebuilt"
+)
 
 st.divider()
 
@@ -87,212 +71,123 @@ else:
 # GENERATE
 # =========================================================
 
-if st.button("Generate Reports"):
+# Session state for reruns, URL for page reloads
+job = get_job(st.session_state.get("job_id") or st.query_params.get("job"))
+
+job_running = job is not None and not job.finished
+
+if st.button("Generate Reports", disabled=job_running):
+
+    if mode == "Merged":
+        sales_files = {"Zamalek": sales_zam_file, "Alexandria": sales_alex_file}
+        inventory_files = {
+            "Zamalek": inventory_zam_file,
+            "Alexandria": inventory_alex_file
+        }
+    else:
+        sales_files = {mode: sales_file}
+        inventory_files = {mode: inventory_file}
+
+    # Runs on a server thread — the page only polls it
+    job = start_job(
+        mode,
+        payout_cycle,
+        sales_files,
+        inventory_files,
+        deals_file,
+        max_workers=max_workers,
+        use_workbook_cache=use_workbook_cache
+    )
 
-    zip_buffer = BytesIO()
+    st.session_state["job_id"] = job.id
+    st.query_params["job"] = job.id
+    job_running = True
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
 
-        # =====================================================
-        # MERGED MODE
-        # =====================================================
+# =========================================================
+# JOB STATUS / DOWNLOAD
+# =========================================================
 
-        if mode == "Merged":
+def format_seconds(seconds):
 
-            sales_zam = remove_refunds_and_original_sales(
-                pd.read_excel(sales_zam_file)
-            )
-            inv_zam = pd.read_excel(inventory_zam_file)
+    minutes, seconds = divmod(int(seconds), 60)
 
-            sales_alex = remove_refunds_and_original_sales(
-                pd.read_excel(sales_alex_file)
-            )
-            inv_alex = pd.read_excel(inventory_alex_file)
-
-            # 🔥 USE SAME NORMALIZATION EVERYWHERE
-            sales_zam["brand"] = sales_zam["brand"].apply(normalize_brand_name)
-            sales_alex["brand"] = sales_alex["brand"].apply(normalize_brand_name)
-
-            inv_zam["brand"] = inv_zam["brand"].apply(normalize_brand_name)
-            inv_alex["brand"] = inv_alex["brand"].apply(normalize_brand_name)
-
-            # Ensure numeric
-            inv_zam["available_quantity"] = pd.to_numeric(
-                inv_zam["available_quantity"], errors="coerce"
-            ).fillna(0)
-
-            inv_alex["available_quantity"] = pd.to_numeric(
-                inv_alex["available_quantity"], errors="coerce"
-            ).fillna(0)
-
-            # Load deals
-            deals_merged = load_deals_by_mode(deals_file, "Merged")
-            deals_zam = load_deals_by_mode(deals_file, "Zamalek")
-            deals_alex = load_deals_by_mode(deals_file, "Alexandria")
-
-            # Normalize deal keys
-            deals_merged = {
-                normalize_brand_name(k): v for k, v in deals_merged.items()
-            }
-            deals_zam = {
-                normalize_brand_name(k): v for k, v in deals_zam.items()
-            }
-            deals_alex = {
-                normalize_brand_name(k): v for k, v in deals_alex.items()
-            }
-
-            all_brands = set(
-                list(inv_zam["brand"].unique()) +
-                list(inv_alex["brand"].unique())
-            )
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
 
-            for brand in all_brands:
-
-                zam_inv_brand = inv_zam[inv_zam["brand"] == brand]
-                alex_inv_brand = inv_alex[inv_alex["brand"] == brand]
-
-                zam_qty = zam_inv_brand["available_quantity"].sum()
-                alex_qty = alex_inv_brand["available_quantity"].sum()
-
-                if zam_qty == 0 and alex_qty == 0:
-                    continue
-
-                if alex_qty > 0 and zam_qty > 0:
-                    branch_type = "Merged"
-                    deals_dict = deals_merged
-                    brand_inventory = pd.concat(
-                        [alex_inv_brand, zam_inv_brand],
-                        ignore_index=True
-                    )
-                elif zam_qty > 0:
-                    branch_type = "Zamalek"
-                    deals_dict = deals_zam
-                    brand_inventory = zam_inv_brand.copy()
-                else:
-                    branch_type = "Alexandria"
-                    deals_dict = deals_alex
-                    brand_inventory = alex_inv_brand.copy()
-
-                brand_sales = pd.concat([
-                    sales_zam[sales_zam["brand"] == brand],
-                    sales_alex[sales_alex["brand"] == brand]
-                ])
-
-                total_sales_qty = brand_sales["quantity"].sum()
-                total_inventory_qty = brand_inventory["available_quantity"].sum()
-
-                deal = deals_dict.get(brand, {"percentage": 0, "rent": 0})
-
-                if total_sales_qty == 0 and total_inventory_qty > 0:
-                    subfolder = "Empty Brand Guard"
-                elif deal["percentage"] == 0 and deal["rent"] == 0:
-                    subfolder = "No Deal"
-                else:
-                    subfolder = None
-
-                workbook_buffer = build_brand_workbook(
-                    brand_name=brand,
-                    mode=branch_type,
-                    payout_cycle=payout_cycle,
-                    brand_sales=brand_sales,
-                    brand_inventory=brand_inventory,
-                    deals_dict=deals_dict
-                )
 
-                base_path = f"Reports/{branch_type}"
+def show_run_timings(job):
 
-                if subfolder:
-                    file_path = f"{base_path}/{subfolder}/{brand}.xlsx"
-                else:
-                    file_path = f"{base_path}/{brand}.xlsx"
+    manifest = job.manifest()
 
-                zip_file.writestr(file_path, workbook_buffer.getvalue())
+    with st.expander("Run Timings"):
 
-        # =====================================================
-        # SINGLE MODE
-        # =====================================================
+        st.dataframe(
+            pd.DataFrame(manifest["stages"]),
+            hide_index=True,
+            use_container_width=True
+        )
 
-        else:
+        st.caption(f"Slowest {SLOWEST_BRANDS} brand workbooks")
 
-            sales_df = remove_refunds_and_original_sales(
-                pd.read_excel(sales_file)
-            )
-            inventory_df = pd.read_excel(inventory_file)
+        st.dataframe(
+            pd.DataFrame(manifest["slowest_brands"]),
+            hide_index=True,
+            use_container_width=True
+        )
 
-            sales_df["brand"] = sales_df["brand"].apply(normalize_brand_name)
-            inventory_df["brand"] = inventory_df["brand"].apply(normalize_brand_name)
 
-            deals_dict = load_deals_by_mode(deals_file, mode)
-            deals_dict = {
-                normalize_brand_name(k): v for k, v in deals_dict.items()
-            }
+if job is not None:
 
-            brands = inventory_df["brand"].unique()
+    @st.fragment(run_every=POLL_SECONDS if job_running else None)
+    def job_panel():
 
-            for brand in brands:
+        if job_running and job.finished:
+            # Leave polling mode: full rerun re-enables Generate and
+            # shows the result once
+            st.rerun()
 
-                brand_inventory = inventory_df[
-                    inventory_df["brand"] == brand
-                ]
+        progress = job.progress()
 
-                brand_sales = sales_df[
-                    sales_df["brand"] == brand
-                ]
+        if progress["status"] == DONE:
 
-                total_sales_qty = brand_sales["quantity"].sum()
-                total_inventory_qty = brand_inventory["available_quantity"].sum()
+            st.success(
+                f"{job.mode} reports ready "
+                f"({format_seconds(progress['elapsed_seconds'])})"
+            )
 
-                if total_inventory_qty == 0:
-                    continue
+            show_run_timings(job)
 
-                deal = deals_dict.get(brand, {"percentage": 0, "rent": 0})
+            with open(job.zip_path, "rb") as archive:
+                st.download_button(
+                    "Download Reports ZIP",
+                    data=archive.read(),
+                    file_name=zip_file_name(job.mode),
+                    mime="application/zip"
+                )
 
-                if total_sales_qty == 0 and total_inventory_qty > 0:
-                    subfolder = "Empty Brand Guard"
-                elif deal["percentage"] == 0 and deal["rent"] == 0:
-                    subfolder = "No Deal"
-                else:
-                    subfolder = None
+        elif progress["status"] == FAILED:
+            st.error(progress["error"])
 
-                workbook_buffer = build_brand_workbook(
-                    brand_name=brand,
-                    mode=mode,
-                    payout_cycle=payout_cycle,
-                    brand_sales=brand_sales,
-                    brand_inventory=brand_inventory,
-                    deals_dict=deals_dict
-                )
+        elif progress["status"] == CANCELLED:
+            st.warning("Report generation was cancelled.")
 
-                base_path = f"Reports/{mode}"
+        else:
+            done = progress["brands_done"]
+            total = progress["brands_total"]
 
-                if subfolder:
-                    file_path = f"{base_path}/{subfolder}/{brand}.xlsx"
-                else:
-                    file_path = f"{base_path}/{brand}.xlsx"
+            text = progress["stage"].replace("_", " ").title()
 
-                zip_file.writestr(file_path, workbook_buffer.getvalue())
+            if total:
+                text += f" — {done}/{total} brands"
 
-            summary_wb = build_branch_summary_workbook(
-                branch_name=mode,
-                payout_cycle=payout_cycle,
-                sales_df=sales_df,
-                inventory_df=inventory_df,
-                deals_dict=deals_dict
-            )
+            if progress["eta_seconds"] is not None:
+                text += f" — about {format_seconds(progress['eta_seconds'])} left"
 
-            summary_buffer = BytesIO()
-            summary_wb.save(summary_buffer)
+            st.progress(done / total if total else 0.0, text=text)
 
-            zip_file.writestr(
-                f"Reports/{mode}/{mode}_Summary.xlsx",
-                summary_buffer.getvalue()
-            )
+            st.caption(f"Elapsed {format_seconds(progress['elapsed_seconds'])}")
 
-    zip_buffer.seek(0)
+            if st.button("Cancel", disabled=progress["status"] != RUNNING):
+                job.cancel()
 
-    st.download_button(
-        "Download Reports ZIP",
-        data=zip_buffer,
-        file_name=f"SlotX_Reports_{mode}.zip",
-        mime="application/zip"
-    )
+    job_panel()
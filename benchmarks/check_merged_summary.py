@@ -0,0 +1,168 @@
+# benchmarks/check_merged_summary.py
+#
+# Consistency check of a merged-mode run on synthetic data: every row of
+# Merged_Summary.xlsx → "Combined Performance" must show the same sales
+# and post-deal figures as that brand's own workbook.
+#
+#   python -m benchmarks.check_merged_summary --brands 40
+#
+# Exits non-zero (listing the brands) when any figure disagrees.
+
+import argparse
+import io
+import math
+import os
+import sys
+import tempfile
+import zipfile
+
+from openpyxl import load_workbook
+
+from benchmarks.synthetic_data import write_dataset
+from core.deals_engine import normalize_brand_name
+from pipeline import generate_reports_zip
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SUMMARY_ENTRY = "Reports/Merged/Merged_Summary.xlsx"
+
+# Combined Performance header → brand workbook Report label
+CHECKED_FIGURES = {
+    "Sales Qty": "Total Sales Quantity:",
+    "Sales Money": "Total Sales Money:",
+    "After Percentage": "After Percentage:",
+    "After Rent": "After Rent:",
+    "Inventory Qty": "Total Inventory Quantity:",
+}
+
+
+def _workbook(archive, name):
+
+    return load_workbook(io.BytesIO(archive.read(name)), read_only=True)
+
+
+def brand_workbook_figures(archive):
+    """
+    { normalized brand: { Report label: value } } over every brand workbook.
+    """
+
+    figures = {}
+
+    for name in archive.namelist():
+
+        if not name.endswith(".xlsx") or name == SUMMARY_ENTRY:
+            continue
+
+        details = {
+            label: value
+            for label, value in _workbook(archive, name)["Report"].iter_rows(
+                min_col=1, max_col=2, values_only=True
+            )
+            if label
+        }
+
+        figures[normalize_brand_name(details["Brand Name:"])] = details
+
+    return figures
+
+
+def combined_performance_rows(archive):
+    """
+    { normalized brand: { header: value } } of the Combined Performance table.
+    """
+
+    rows = _workbook(archive, SUMMARY_ENTRY)["Combined Performance"].iter_rows(
+        values_only=True
+    )
+
+    # KPI titles, KPI values, two blank rows, then the table
+    for _ in range(4):
+        next(rows)
+
+    headers = next(rows)
+
+    return {
+        normalize_brand_name(row[1]): dict(zip(headers, row))
+        for row in rows
+        if row and row[0] is not None
+    }
+
+
+def _same(a, b):
+
+    return math.isclose(float(a or 0), float(b or 0), rel_tol=1e-9, abs_tol=1e-6)
+
+
+def check_archive(archive):
+    """
+    [ (brand, header, summary value, workbook value), ... ] that disagree.
+    """
+
+    workbooks = brand_workbook_figures(archive)
+
+    mismatches = []
+
+    for brand, row in combined_performance_rows(archive).items():
+
+        details = workbooks.get(brand)
+
+        # Sold but stocked nowhere: no brand workbook to compare with
+        if details is None:
+            continue
+
+        for header, label in CHECKED_FIGURES.items():
+            if not _same(row[header], details[label]):
+                mismatches.append((brand, header, row[header], details[label]))
+
+    return mismatches
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Check Combined Performance against the brand workbooks"
+    )
+
+    parser.add_argument("--brands", type=int, default=40)
+    parser.add_argument("--rows-per-brand", type=int, default=40)
+    parser.add_argument("--cycle", default="Cycle 1")
+    parser.add_argument("--data-dir", default=os.path.join(BENCHMARK_DIR, "data"))
+
+    args = parser.parse_args(argv)
+
+    paths = write_dataset(
+        args.data_dir,
+        brand_count=args.brands,
+        rows_per_brand=args.rows_per_brand,
+        merged=True
+    )
+
+    with tempfile.TemporaryFile() as output:
+
+        generate_reports_zip(
+            output,
+            "Merged",
+            args.cycle,
+            {"Zamalek": paths["sales"], "Alexandria": paths["sales_alex"]},
+            {"Zamalek": paths["inventory"], "Alexandria": paths["inventory_alex"]},
+            paths["deals"],
+            use_workbook_cache=False
+        )
+
+        output.seek(0)
+
+        with zipfile.ZipFile(output) as archive:
+            mismatches = check_archive(archive)
+
+    for brand, header, summary_value, workbook_value in mismatches:
+        print(f"{brand}: {header} summary={summary_value} workbook={workbook_value}")
+
+    brands = len({brand for brand, *_ in mismatches})
+    print(f"{brands} brand(s) disagree")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# benchmarks/run_benchmark.py
+#
+# End-to-end timing of the report pipeline on synthetic data.
+#
+#   python -m benchmarks.run_benchmark --brands 2000 --rows-per-brand 100
+#   python -m benchmarks.run_benchmark --merged --workers 4
+#
+# The run goes through pipeline.write_reports, so the stages timed are
+# the ones a real run records in run_manifest.json. Every run is
+# appended as one JSON line to --results, so runs can be compared
+# across commits.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+
+import utils.disk_cache as disk_cache
+from benchmarks.synthetic_data import write_dataset
+from core.run_metrics import RunMetrics
+from core.zip_builder import open_spooled_zip
+from pipeline import write_reports
+from reports.sheet_writers import SHEET_WRITER
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _git_commit():
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args):
+
+    paths = write_dataset(
+        args.data_dir,
+        brand_count=args.brands,
+        rows_per_brand=args.rows_per_brand,
+        products_per_brand=args.products_per_brand,
+        refund_ratio=args.refund_ratio,
+        merged=args.merged
+    )
+
+    mode = "Merged" if args.merged else args.mode
+
+    if args.merged:
+        sales_files = {"Zamalek": paths["sales"], "Alexandria": paths["sales_alex"]}
+        inventory_files = {
+            "Zamalek": paths["inventory"],
+            "Alexandria": paths["inventory_alex"]
+        }
+    else:
+        sales_files = {mode: paths["sales"]}
+        inventory_files = {mode: paths["inventory"]}
+
+    # Ingest sidecars / cached workbooks of earlier runs would make this
+    # a warm run — start from an empty cache unless --cache-dir is given
+    cache_root = args.cache_dir or tempfile.mkdtemp(prefix="slotx_benchmark_")
+    disk_cache.CACHE_ROOT = cache_root
+
+    timer = RunMetrics(
+        mode=mode,
+        payout_cycle=args.cycle,
+        max_workers=args.workers,
+        use_workbook_cache=True
+    )
+
+    zip_spool, zip_file = open_spooled_zip()
+
+    try:
+        write_reports(
+            zip_file,
+            mode,
+            args.cycle,
+            sales_files,
+            inventory_files,
+            paths["deals"],
+            max_workers=args.workers,
+            metrics=timer
+        )
+
+        with timer.stage("zip_write"):
+            zip_file.close()
+
+        zip_spool.seek(0, os.SEEK_END)
+        zip_bytes = zip_spool.tell()
+    finally:
+        zip_file.close()
+        zip_spool.close()
+
+        if args.cache_dir is None:
+            shutil.rmtree(cache_root, ignore_errors=True)
+
+    stages = {record["stage"]: record for record in timer.stage_table()}
+
+    timed = {name: record["seconds"] for name, record in stages.items()}
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "params": {
+            "brands": args.brands,
+            "rows_per_brand": args.rows_per_brand,
+            "products_per_brand": args.products_per_brand,
+            "refund_ratio": args.refund_ratio,
+            "mode": mode,
+            "cycle": args.cycle,
+            "workers": args.workers,
+            "sheet_writer": SHEET_WRITER,
+            "warm_cache": args.cache_dir is not None,
+        },
+        "counts": {
+            # Sales (refunds removed) + inventory rows, all branches
+            "ingest_rows": stages["ingest"]["rows"] or 0,
+            "brand_workbooks": len(timer.brands),
+            "cached_workbooks": sum(1 for brand in timer.brands if brand["cached"]),
+            "workbook_bytes": sum(brand["output_bytes"] for brand in timer.brands),
+            "zip_bytes": zip_bytes,
+            "refunds": {
+                "refund_count": stages["refunds"]["rows"] or 0,
+                "matched_count": stages["refunds"]["matched"],
+                "unmatched_count": stages["refunds"]["unmatched"],
+            },
+        },
+        "stages": timed,
+        "total_seconds": round(sum(timed.values()), 4),
+        "slowest_brands": timer.slowest_brands(),
+    }
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Slot-X pipeline benchmark")
+
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument("--rows-per-brand", type=int, default=50)
+    parser.add_argument("--products-per-brand", type=int, default=20)
+    parser.add_argument("--refund-ratio", type=float, default=0.03)
+    parser.add_argument("--merged", action="store_true",
+                        help="two-branch data, merged-mode pipeline")
+    parser.add_argument("--mode", default="Zamalek",
+                        choices=["Zamalek", "Alexandria"])
+    parser.add_argument("--cycle", default="Cycle 1")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--data-dir", default=os.path.join(BENCHMARK_DIR, "data"))
+    parser.add_argument("--results", default=os.path.join(BENCHMARK_DIR, "results.jsonl"))
+    parser.add_argument("--cache-dir", default=None,
+                        help="reuse this cache directory (warm run); "
+                             "default: a fresh, empty one")
+
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args)
+
+    with open(args.results, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    for stage, seconds in result["stages"].items():
+        print(f"{stage:<18}{seconds:>10.3f}s")
+
+    print(f"{'total':<18}{result['total_seconds']:>10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# benchmarks/synthetic_data.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+
+AR_PRODUCTS = [
+    "قميص قطن",
+    "بنطلون جينز",
+    "فستان سهرة",
+    "جاكيت جلد",
+    "تيشيرت",
+    "شنطة يد",
+    "حذاء رياضي",
+    "طرحة حرير",
+]
+
+EN_PRODUCTS = [
+    "Cotton Shirt",
+    "Denim Pants",
+    "Evening Dress",
+    "Leather Jacket",
+    "T-Shirt",
+    "Handbag",
+    "Sneakers",
+    "Silk Scarf",
+]
+
+SIZES = ["S", "M", "L", "XL", "XXL", "38", "40", "42"]
+
+DEAL_MODES = ["Zamalek", "Alexandria", "Merged"]
+
+
+def _brand_names(brand_count, rng):
+
+    # Raw spellings vary the way real exports do (case, spaces, NBSP)
+    names = []
+
+    for i in range(brand_count):
+        name = f"Brand {i:05d}"
+        style = rng.integers(0, 4)
+        if style == 1:
+            name = name.upper()
+        elif style == 2:
+            name = f" {name.lower()} "
+        elif style == 3:
+            name = name.replace(" ", "\xa0")
+        names.append(name)
+
+    return names
+
+
+def make_catalog(brand_count, products_per_brand, seed=0):
+    """
+    One row per (brand, product, size) — the shared product master
+    both branches sell from.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    brands = _brand_names(brand_count, rng)
+
+    n = brand_count * products_per_brand
+    brand_idx = np.repeat(np.arange(brand_count), products_per_brand)
+    product_idx = rng.integers(0, len(AR_PRODUCTS), n)
+    size_idx = rng.integers(0, len(SIZES), n)
+
+    return pd.DataFrame({
+        "brand": np.array(brands, dtype=object)[brand_idx],
+        "name_ar": [
+            f"{AR_PRODUCTS[p]} - {SIZES[s]}"
+            for p, s in zip(product_idx, size_idx)
+        ],
+        "name_en": [
+            f"{EN_PRODUCTS[p]} - {SIZES[s]}"
+            for p, s in zip(product_idx, size_idx)
+        ],
+        "barcode": 6220000000000 + np.arange(n),
+        "sale_price": rng.integers(150, 5000, n).astype(float),
+    })
+
+
+def make_sales(catalog, rows_per_brand, refund_ratio=0.03, seed=1):
+    """
+    Sales lines in the export's column shape. A `refund_ratio` share of
+    lines gets a matching negative line later in the file.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    brand_count = catalog["brand"].nunique()
+    n = brand_count * rows_per_brand
+
+    picks = rng.integers(0, len(catalog), n)
+    lines = catalog.iloc[picks].reset_index(drop=True)
+
+    quantity = rng.choice([1, 1, 1, 2, 2, 3], n)
+
+    sales = pd.DataFrame({
+        "brand": lines["brand"],
+        "name_ar": lines["name_ar"],
+        "name_en": lines["name_en"],
+        "barcode": lines["barcode"],
+        "quantity": quantity,
+        "total": quantity * lines["sale_price"].to_numpy(),
+    })
+
+    refund_count = int(n * refund_ratio)
+
+    if refund_count:
+        refunds = sales.sample(refund_count, random_state=seed).copy()
+        refunds["quantity"] = -refunds["quantity"]
+        refunds["total"] = -refunds["total"]
+        sales = pd.concat([sales, refunds], ignore_index=True)
+
+    return sales
+
+
+def make_inventory(catalog, seed=2):
+
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+        "brand": catalog["brand"],
+        "name_en": catalog["name_en"],
+        "barcodes": catalog["barcode"],
+        "sale_price": catalog["sale_price"],
+        "available_quantity": rng.integers(0, 30, len(catalog)),
+    })
+
+
+def make_deals(brands, seed=3):
+    """
+    One sheet per mode, as the deals upload expects.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    sheets = {}
+
+    for mode in DEAL_MODES:
+        n = len(brands)
+        sheets[mode] = pd.DataFrame({
+            "Brand Name": brands,
+            "Deal Percentage (%)": rng.choice([0, 10, 15, 20, 25], n),
+            "Rent Amount (EGP)": rng.choice([0, 0, 500, 1000, 2500], n),
+        })
+
+    return sheets
+
+
+def write_dataset(
+    directory,
+    brand_count=200,
+    rows_per_brand=50,
+    products_per_brand=20,
+    refund_ratio=0.03,
+    merged=False,
+    seed=0
+):
+    """
+    Write sales / inventory / deals workbooks and return their paths:
+
+        { "sales": ..., "inventory": ..., "deals": ... }
+        merged adds "sales_alex" / "inventory_alex"
+        (Alexandria stocks every other brand of the same catalog)
+
+    Existing files for the same parameters are reused.
+    """
+
+    tag = (
+        f"b{brand_count}_r{rows_per_brand}_p{products_per_brand}"
+        f"_f{refund_ratio}_s{seed}{'_merged' if merged else ''}"
+    )
+
+    directory = os.path.join(directory, tag)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = {
+        "sales": os.path.join(directory, "sales.xlsx"),
+        "inventory": os.path.join(directory, "inventory.xlsx"),
+        "deals": os.path.join(directory, "deals.xlsx"),
+    }
+
+    if merged:
+        paths["sales_alex"] = os.path.join(directory, "sales_alex.xlsx")
+        paths["inventory_alex"] = os.path.join(directory, "inventory_alex.xlsx")
+
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+
+    catalog = make_catalog(brand_count, products_per_brand, seed)
+
+    make_sales(catalog, rows_per_brand, refund_ratio, seed + 1).to_excel(
+        paths["sales"], index=False
+    )
+    make_inventory(catalog, seed + 2).to_excel(paths["inventory"], index=False)
+
+    if merged:
+        brands = catalog["brand"].unique()
+        alex_catalog = catalog[catalog["brand"].isin(brands[::2])]
+
+        make_sales(alex_catalog, rows_per_brand, refund_ratio, seed + 4).to_excel(
+            paths["sales_alex"], index=False
+        )
+        make_inventory(alex_catalog, seed + 5).to_excel(
+            paths["inventory_alex"], index=False
+        )
+
+    with pd.ExcelWriter(paths["deals"]) as writer:
+        for mode, deals_df in make_deals(catalog["brand"].unique(), seed + 3).items():
+            deals_df.to_excel(writer, sheet_name=mode, index=False)
+
+    return paths
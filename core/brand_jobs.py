@@ -0,0 +1,248 @@
+# core/brand_jobs.py
+
+import pandas as pd
+
+from core.partition_engine import partition_by_brand, brand_slice
+from core.merge_engine import merge_branch_inventory
+from core.run_metrics import RunMetrics
+from core.kpi_engine import (
+    brand_aggregates,
+    sales_aggregates,
+    brand_kpis
+)
+
+
+NO_DEAL = {"percentage": 0, "rent": 0}
+
+
+def classify_subfolder(total_sales_qty, total_inventory_qty, deal):
+
+    if total_sales_qty == 0 and total_inventory_qty > 0:
+        return "Empty Brand Guard"
+
+    if deal["percentage"] == 0 and deal["rent"] == 0:
+        return "No Deal"
+
+    return None
+
+
+def merged_branch_type(zam_qty, alex_qty):
+    """
+    Where a brand goes in merged mode, from its stock per branch:
+    "Merged" when both branches hold it, else the one that does.
+    None for a brand with no stock anywhere (it gets no workbook).
+    The branch type also picks the deals tab.
+    """
+
+    if zam_qty == 0 and alex_qty == 0:
+        return None
+
+    if alex_qty > 0 and zam_qty > 0:
+        return "Merged"
+
+    if zam_qty > 0:
+        return "Zamalek"
+
+    return "Alexandria"
+
+
+def report_file_path(branch_type, brand, subfolder):
+
+    base_path = f"Reports/{branch_type}"
+
+    if subfolder:
+        return f"{base_path}/{subfolder}/{brand}.xlsx"
+
+    return f"{base_path}/{brand}.xlsx"
+
+
+def _brand_job(
+    brand, branch_type, payout_cycle, brand_sales, brand_inventory, deal, kpis,
+    generated_at
+):
+
+    # Only this brand's deal and aggregate row travel to the worker
+    return {
+        "brand_name": brand,
+        "mode": branch_type,
+        "payout_cycle": payout_cycle,
+        "brand_sales": brand_sales,
+        "brand_inventory": brand_inventory,
+        "deals_dict": {brand: deal},
+        "kpis": kpis,
+        "generated_at": generated_at
+    }
+
+
+# =====================================================
+# SINGLE MODE
+# =====================================================
+
+def plan_single_mode_jobs(
+    mode, payout_cycle, sales_df, inventory_df, deals_dict, generated_at=None,
+    metrics=None
+):
+    """
+    Jobs for one branch, plus the branch's brand aggregate table (the
+    summary's Performance tab reads the same table):
+
+        [ (file_path, build_brand_workbook kwargs), ... ], { mode: table }
+
+    generated_at: the run's Metadata timestamp, shared by every brand
+    so their workbooks reuse one skeleton.
+
+    metrics: the run's RunMetrics; grouping by brand is timed as the
+    "partition" stage.
+    """
+
+    metrics = metrics or RunMetrics()
+
+    # Group once, then slice per brand by position
+    with metrics.stage("partition", rows=len(sales_df) + len(inventory_df)):
+        sales_parts = partition_by_brand(sales_df)
+        inventory_parts = partition_by_brand(inventory_df)
+
+    # Branch-wide totals / best sellers in one pass
+    kpi_table = brand_aggregates(sales_df, inventory_df)
+
+    brand_jobs = []
+
+    for brand in inventory_df["brand"].unique():
+
+        kpis = brand_kpis(kpi_table, brand)
+
+        total_sales_qty = kpis["sales_qty"]
+        total_inventory_qty = kpis["inventory_qty"]
+
+        if total_inventory_qty == 0:
+            continue
+
+        brand_inventory = brand_slice(inventory_df, inventory_parts, brand)
+        brand_sales = brand_slice(sales_df, sales_parts, brand)
+
+        deal = deals_dict.get(brand, NO_DEAL)
+
+        subfolder = classify_subfolder(total_sales_qty, total_inventory_qty, deal)
+
+        brand_jobs.append((
+            report_file_path(mode, brand, subfolder),
+            _brand_job(
+                brand, mode, payout_cycle, brand_sales, brand_inventory,
+                deal, kpis, generated_at
+            )
+        ))
+
+    return brand_jobs, {mode: kpi_table}
+
+
+# =====================================================
+# MERGED MODE
+# =====================================================
+
+def plan_merged_mode_jobs(
+    payout_cycle,
+    sales_zam,
+    inv_zam,
+    sales_alex,
+    inv_alex,
+    deals_zam,
+    deals_alex,
+    deals_merged,
+    generated_at=None,
+    metrics=None
+):
+    """
+    Each brand lands in Zamalek, Alexandria or Merged depending on
+    which branches hold its stock.
+
+    Merged brands get the barcode-level merged inventory
+    (alex_qty / zamalek_qty / total per product).
+
+    Returns the jobs plus each branch's brand aggregate table (totals
+    only, no best sellers), which the merged summary reads:
+
+        [ (file_path, kwargs), ... ], { "Zamalek": table, "Alexandria": table }
+
+    metrics: as for plan_single_mode_jobs.
+    """
+
+    metrics = metrics or RunMetrics()
+
+    # Both branches' sales stacked once (Zamalek rows first)
+    sales_all = pd.concat([sales_zam, sales_alex])
+
+    # Both inventories joined on barcode once, for every brand
+    inv_merged = merge_branch_inventory(inv_alex, inv_zam)
+
+    # Group every frame once, then slice per brand by position
+    partitioned = (sales_all, inv_zam, inv_alex, inv_merged)
+
+    with metrics.stage("partition", rows=sum(len(df) for df in partitioned)):
+        sales_parts = partition_by_brand(sales_all)
+        inv_zam_parts = partition_by_brand(inv_zam)
+        inv_alex_parts = partition_by_brand(inv_alex)
+        inv_merged_parts = partition_by_brand(inv_merged)
+
+    all_brands = set(inv_zam_parts) | set(inv_alex_parts)
+
+    # Sales aggregate over both branches (with best sellers) for the
+    # brand workbooks; per-branch totals + stock for stock and summary
+    sales_table = sales_aggregates(sales_all)
+    zam_table = brand_aggregates(sales_zam, inv_zam, top_products=False)
+    alex_table = brand_aggregates(sales_alex, inv_alex, top_products=False)
+
+    brand_jobs = []
+
+    for brand in all_brands:
+
+        zam_kpis = brand_kpis(zam_table, brand)
+        alex_kpis = brand_kpis(alex_table, brand)
+
+        branch_type = merged_branch_type(
+            zam_kpis["inventory_qty"], alex_kpis["inventory_qty"]
+        )
+
+        if branch_type is None:
+            continue
+
+        if branch_type == "Merged":
+            deals_dict = deals_merged
+            stock_kpis = [alex_kpis, zam_kpis]
+            brand_inventory = brand_slice(inv_merged, inv_merged_parts, brand)
+        elif branch_type == "Zamalek":
+            deals_dict = deals_zam
+            stock_kpis = [zam_kpis]
+            brand_inventory = brand_slice(inv_zam, inv_zam_parts, brand)
+        else:
+            deals_dict = deals_alex
+            stock_kpis = [alex_kpis]
+            brand_inventory = brand_slice(inv_alex, inv_alex_parts, brand)
+
+        brand_sales = brand_slice(sales_all, sales_parts, brand)
+
+        kpis = brand_kpis(sales_table, brand)
+        kpis["inventory_qty"] = sum(k["inventory_qty"] for k in stock_kpis)
+        kpis["inventory_value"] = sum(k["inventory_value"] for k in stock_kpis)
+
+        total_sales_qty = kpis["sales_qty"]
+        total_inventory_qty = kpis["inventory_qty"]
+
+        deal = deals_dict.get(brand, NO_DEAL)
+
+        subfolder = classify_subfolder(total_sales_qty, total_inventory_qty, deal)
+
+        brand_jobs.append((
+            report_file_path(branch_type, brand, subfolder),
+            _brand_job(
+                brand,
+                branch_type,
+                payout_cycle,
+                brand_sales,
+                brand_inventory,
+                deal,
+                kpis,
+                generated_at
+            )
+        ))
+
+    return brand_jobs, {"Zamalek": zam_table, "Alexandria": alex_table}
@@ -1,5 +1,18 @@
+import numpy as np
 import pandas as pd
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+
+from utils.file_helpers import read_file_bytes, content_hash
+
+
+# Distinct raw brand spellings remembered across a run
+BRAND_CACHE_SIZE = 65536
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]")
 
 
 # =====================================================
@@ -19,7 +32,11 @@ def normalize_brand_name(name: str) -> str:
     if pd.isna(name):
         return ""
 
-    name = str(name)
+    return _normalize_brand_text(str(name))
+
+
+@lru_cache(maxsize=BRAND_CACHE_SIZE)
+def _normalize_brand_text(name: str) -> str:
 
     # remove weird excel spaces
     name = name.replace("\xa0", " ")
@@ -28,58 +45,165 @@ def normalize_brand_name(name: str) -> str:
     name = name.lower().strip()
 
     # remove ANY character that is not letter or number
-    name = re.sub(r"[^a-z0-9]", "", name)
+    return NON_ALPHANUMERIC.sub("", name)
+
+
+def normalize_brand_series(brands: pd.Series) -> pd.Series:
+    """
+    Bulk version of normalize_brand_name.
+
+    Each DISTINCT brand is normalized once (pd.factorize), then mapped
+    back to every row — cost follows the number of brands, not rows.
+    """
+
+    codes, uniques = pd.factorize(brands)
 
-    return name
+    # NaN gets code -1 → last slot → ""
+    normalized = np.array(
+        [normalize_brand_name(brand) for brand in uniques] + [""],
+        dtype=object
+    )
+
+    return pd.Series(
+        normalized[codes],
+        index=brands.index,
+        name=brands.name
+    )
 
 
 # =====================================================
 # LOAD DEALS BY MODE (Zamalek / Alexandria / Merged)
 # =====================================================
 
-def load_deals_by_mode(deals_file, mode: str) -> dict:
+REQUIRED_DEAL_COLUMNS = [
+    "Brand Name",
+    "Deal Percentage (%)",
+    "Rent Amount (EGP)"
+]
+
+# Parsed deals files kept per process (keyed by content hash)
+DEALS_CACHE_SIZE = 8
+
+_deals_cache = OrderedDict()
+
+# Background jobs run on their own threads and share the cache
+_deals_cache_lock = threading.Lock()
+
+
+def load_all_deals(deals_file) -> dict:
+    """
+    Parse EVERY sheet of the deals workbook in one read.
+
+    Cached by the file's content hash, so the other modes / payout
+    cycle of the same upload never reopen the workbook.
+
+    Returns:
+        { sheet_name: deals_dict | Exception }
+    """
+
+    data = read_file_bytes(deals_file)
+    key = content_hash(data)
+
+    with _deals_cache_lock:
+        if key in _deals_cache:
+            _deals_cache.move_to_end(key)
+            return _deals_cache[key]
 
     try:
-        deals_df = pd.read_excel(deals_file, sheet_name=mode)
+        sheets = pd.read_excel(BytesIO(data), sheet_name=None)
     except Exception as e:
-        raise Exception(f"Could not read deals sheet '{mode}': {str(e)}")
+        raise Exception(f"Could not read deals file: {str(e)}")
+
+    parsed = {}
+
+    for sheet_name, deals_df in sheets.items():
+        try:
+            parsed[sheet_name] = deals_from_sheet(deals_df, sheet_name)
+        except (ValueError, TypeError) as e:
+            # Only fatal when that mode is actually requested
+            parsed[sheet_name] = e
+
+    with _deals_cache_lock:
+        _deals_cache[key] = parsed
+
+        while len(_deals_cache) > DEALS_CACHE_SIZE:
+            _deals_cache.popitem(last=False)
+
+    return parsed
+
+
+def load_deals_by_mode(deals_file, mode: str) -> dict:
+
+    parsed = load_all_deals(deals_file)
+
+    if mode not in parsed:
+        raise Exception(
+            f"Could not read deals sheet '{mode}': Worksheet named '{mode}' not found"
+        )
+
+    deals_dict = parsed[mode]
 
-    deals_df.columns = deals_df.columns.str.strip()
+    if isinstance(deals_dict, Exception):
+        raise deals_dict
 
-    required_columns = [
-        "Brand Name",
-        "Deal Percentage (%)",
-        "Rent Amount (EGP)"
-    ]
+    return dict(deals_dict)
 
-    for col in required_columns:
+
+def deals_from_sheet(deals_df: pd.DataFrame, mode: str) -> dict:
+    """
+    Build { normalized_brand: {"percentage", "rent"} } with column
+    operations (no per-row loop).
+    """
+
+    deals_df = deals_df.copy()
+    deals_df.columns = deals_df.columns.astype(str).str.strip()
+
+    for col in REQUIRED_DEAL_COLUMNS:
         if col not in deals_df.columns:
             raise ValueError(
                 f"Missing required column '{col}' in deals sheet '{mode}'"
             )
 
-    deals_dict = {}
+    brands = normalize_brand_series(deals_df["Brand Name"])
+
+    percentage = pd.to_numeric(
+        deals_df["Deal Percentage (%)"]
+    ).fillna(0.0).astype(float)
 
-    for _, row in deals_df.iterrows():
+    rent = pd.to_numeric(
+        deals_df["Rent Amount (EGP)"]
+    ).fillna(0.0).astype(float)
 
-        raw_brand = row["Brand Name"]
-        normalized_brand = normalize_brand_name(raw_brand)
+    keep = (brands != "").to_numpy()
 
-        if not normalized_brand:
-            continue
+    # Later rows win on duplicate brands (same as before)
+    return {
+        brand: {"percentage": p, "rent": r}
+        for brand, p, r in zip(
+            brands[keep].tolist(),
+            percentage[keep].tolist(),
+            rent[keep].tolist()
+        )
+    }
 
-        percentage = row.get("Deal Percentage (%)", 0)
-        rent = row.get("Rent Amount (EGP)", 0)
 
-        percentage = float(percentage) if pd.notna(percentage) else 0.0
-        rent = float(rent) if pd.notna(rent) else 0.0
+# =====================================================
+# DEALS AS A FRAME (for merges)
+# =====================================================
+
+def deals_frame(deals_dict: dict) -> pd.DataFrame:
+    """
+    { brand: {"percentage", "rent"} } → DataFrame[brand, percentage, rent]
+    """
 
-        deals_dict[normalized_brand] = {
-            "percentage": percentage,
-            "rent": rent
-        }
+    deals = deals_dict.values()
 
-    return deals_dict
+    # Explicit dtypes so an empty dict still merges on "brand"
+    return pd.DataFrame({
+        "brand": pd.Series(list(deals_dict.keys()), dtype=object),
+        "percentage": pd.Series([d["percentage"] for d in deals], dtype=float),
+        "rent": pd.Series([d["rent"] for d in deals], dtype=float)
+    })
 
 
 # =====================================================
@@ -0,0 +1,280 @@
+# core/ingest_engine.py
+
+import os
+from functools import partial
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from core.deals_engine import normalize_brand_series
+from core.refund_engine import clean_refunds
+from core.run_metrics import RunMetrics
+from utils.column_detector import resolve_columns
+from utils.disk_cache import cache_dir, touch, evict_to_size, write_entry
+from utils.file_helpers import read_file_bytes, content_hash
+
+
+# Bump when the prepared frame changes shape, so old sidecars are ignored
+INGEST_CACHE_VERSION = 4
+
+INGEST_CACHE_MAX_BYTES = int(
+    os.environ.get("SLOTX_INGEST_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+)
+
+
+# =====================================================
+# INGEST SCHEMA
+# =====================================================
+
+# Columns the reports read (see utils/column_detector for the export
+# spellings accepted for each), each stored as:
+#   "category" — few distinct values (brand)
+#   "string"   — Arrow-backed text (names, barcodes)
+#   "number"   — smallest integer type when whole, else float64
+SALES_SCHEMA = {
+    "brand": "category",
+    "name_ar": "string",
+    "name_en": "string",
+    "barcode": "string",
+    "quantity": "number",
+    "total": "number"
+}
+
+INVENTORY_SCHEMA = {
+    "brand": "category",
+    "name_en": "string",
+    "barcodes": "string",
+    "sale_price": "number",
+    "available_quantity": "number"
+}
+
+
+def _string_dtype():
+    """
+    Arrow-backed strings with NaN for missing values (pandas >= 2.3),
+    so truthiness / isna behave like the object columns they replace.
+    """
+
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:
+        return object
+
+
+STRING_DTYPE = _string_dtype()
+
+
+def compact_strings(values: pd.Series) -> pd.Series:
+
+    # Numeric codes (barcodes) as their integer text, not "6.22e+12"
+    if pd.api.types.is_float_dtype(values):
+        whole = values.dropna()
+        if (whole == whole.round()).all():
+            values = values.astype("Int64")
+
+    if pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).where(values.notna())
+
+    return values.astype(STRING_DTYPE)
+
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """
+    Typed copy of the schema's columns present in `df`
+    (missing ones are left to the report builders' defaults).
+    """
+
+    columns = {}
+
+    for column, kind in schema.items():
+
+        if column not in df.columns:
+            continue
+
+        values = df[column]
+
+        if kind == "category":
+            values = values.astype("category")
+        elif kind == "string":
+            values = compact_strings(values)
+        else:
+            values = pd.to_numeric(values, errors="coerce", downcast="integer")
+
+        columns[column] = values
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+# =====================================================
+# HEADER PROBE
+# =====================================================
+
+def _probe_header(data: bytes, kind: str) -> dict:
+
+    header = pd.read_excel(BytesIO(data), nrows=0)
+
+    return resolve_columns(header.columns, kind)
+
+
+def probe_columns(file, kind: str) -> dict:
+    """
+    Reads the header row only and resolves column aliases:
+    { export column: report column }.
+
+    Raises ValueError for a missing required column — in well under a
+    second, before any row of the export is parsed.
+    """
+
+    return _probe_header(read_file_bytes(file), kind)
+
+
+# =====================================================
+# PARQUET-CACHED READ
+# =====================================================
+
+def read_excel_cached(file, kind: str, prepare=None,
+                      detect=False) -> pd.DataFrame:
+    """
+    pd.read_excel + `prepare`, memoized on disk.
+
+    The prepared frame is stored as a Parquet sidecar named after the
+    SHA-256 of the uploaded bytes, so a rerun with the identical file
+    skips the XLSX parse entirely.
+
+    detect: probe the header first (kind = "sales" / "inventory"),
+    then parse only the resolved columns, renamed to the report names
+    """
+
+    data = read_file_bytes(file)
+
+    sidecar = os.path.join(
+        cache_dir("ingest"),
+        f"{content_hash(data)}-{kind}-v{INGEST_CACHE_VERSION}.parquet"
+    )
+
+    if os.path.exists(sidecar):
+        try:
+            df = pd.read_parquet(sidecar)
+            touch(sidecar)
+            return df
+        except Exception:
+            # Corrupt / unreadable sidecar → parse again
+            _remove(sidecar)
+
+    if detect:
+        mapping = _probe_header(data, kind)
+
+        df = pd.read_excel(
+            BytesIO(data), usecols=list(mapping)
+        ).rename(columns=mapping)
+    else:
+        df = pd.read_excel(BytesIO(data))
+
+    if prepare is not None:
+        df = prepare(df)
+
+    _write_sidecar(df, sidecar)
+
+    return df
+
+
+def _write_sidecar(df: pd.DataFrame, sidecar: str):
+    """
+    Best effort: some frames (e.g. mixed-type object columns) can't be
+    stored as Parquet — those just aren't cached.
+    """
+
+    try:
+        write_entry(sidecar, df.to_parquet)
+    except Exception:
+        return
+
+    evict_to_size(os.path.dirname(sidecar), INGEST_CACHE_MAX_BYTES)
+
+
+def _remove(path: str):
+
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# =====================================================
+# SALES / INVENTORY LOADERS
+# =====================================================
+
+# attrs key of the clean_refunds stats on a prepared sales frame
+REFUND_STATS = "refund_stats"
+
+
+def normalized_brands(brands: pd.Series) -> pd.Series:
+
+    return normalize_brand_series(brands).astype("category")
+
+
+def prepare_sales(sales_df: pd.DataFrame, metrics=None) -> pd.DataFrame:
+    """
+    Refund stats ride along in attrs (kept by the Parquet sidecar), so
+    a cached ingest still reports them.
+    """
+
+    metrics = metrics or RunMetrics()
+
+    sales_df = apply_schema(sales_df, SALES_SCHEMA)
+
+    # Refunds are matched on the raw brand, before normalization
+    with metrics.stage("refunds"):
+        sales_df, refund_stats = clean_refunds(sales_df)
+
+    sales_df.attrs[REFUND_STATS] = refund_stats
+
+    sales_df["brand"] = normalized_brands(sales_df["brand"])
+
+    return sales_df
+
+
+def prepare_inventory(inventory_df: pd.DataFrame) -> pd.DataFrame:
+
+    inventory_df = apply_schema(inventory_df, INVENTORY_SCHEMA)
+
+    inventory_df["brand"] = normalized_brands(inventory_df["brand"])
+
+    inventory_df["available_quantity"] = pd.to_numeric(
+        inventory_df["available_quantity"].fillna(0), downcast="integer"
+    )
+
+    return inventory_df
+
+
+def load_sales(sales_file, metrics=None) -> pd.DataFrame:
+    """
+    metrics: the run's RunMetrics. Refund cleaning is its own "refunds"
+    stage — refund rows, plus how many were matched to a sale.
+    """
+
+    metrics = metrics or RunMetrics()
+
+    sales_df = read_excel_cached(
+        sales_file, "sales", partial(prepare_sales, metrics=metrics), detect=True
+    )
+
+    # Popped so the stats don't follow every slice of the frame
+    refund_stats = sales_df.attrs.pop(REFUND_STATS, None) or {}
+
+    with metrics.stage("refunds") as stage:
+        stage.add(
+            rows=refund_stats.get("refund_count", 0),
+            matched=refund_stats.get("matched_count", 0),
+            unmatched=refund_stats.get("unmatched_count", 0)
+        )
+
+    return sales_df
+
+
+def load_inventory(inventory_file) -> pd.DataFrame:
+
+    return read_excel_cached(
+        inventory_file, "inventory", prepare_inventory, detect=True
+    )
@@ -3,76 +3,185 @@
 import pandas as pd
 
 
-def calculate_sales_totals(brand_sales: pd.DataFrame):
-    if brand_sales.empty:
-        return 0, 0
+# Columns of the aggregate table (one row per brand) and their fill
+# value for brands that only appear on the other side
+SALES_AGGREGATES = {
+    "sales_lines": 0,
+    "sales_qty": 0,
+    "sales_money": 0.0,
+    "top_product": "",
+    "top_product_qty": 0,
+    "top_size": ""
+}
+
+INVENTORY_AGGREGATES = {
+    "inventory_qty": 0,
+    "inventory_value": 0.0
+}
+
+
+def _aligned(frame: pd.DataFrame, brands, defaults: dict) -> pd.DataFrame:
+    """
+    `frame` reindexed to `brands`, gaps filled per column
+    (reindex with fill_value keeps integer columns integer).
+    """
+
+    return pd.DataFrame(
+        {
+            column: (
+                frame[column].reindex(brands, fill_value=default)
+                if column in frame.columns
+                else pd.Series(default, index=brands)
+            )
+            for column, default in defaults.items()
+        },
+        index=brands
+    )
 
-    total_qty = brand_sales["quantity"].sum()
-    total_money = brand_sales["total"].sum()
 
-    return total_qty, total_money
+def _top_per_brand(rows: pd.DataFrame, column: str, by_name: bool):
+    """
+    (label, summed qty) with the highest qty per brand.
 
+    by_name: ties go to the first label in name order,
+    otherwise to the label seen first in the rows.
+    """
 
-def calculate_inventory_totals(brand_inventory: pd.DataFrame):
-    if brand_inventory.empty:
-        return 0, 0
+    grouped = (
+        rows.groupby(["brand", column], sort=by_name, observed=True)["quantity"]
+        .sum()
+        .reset_index()
+    )
 
-    total_qty = brand_inventory["available_quantity"].sum()
+    # Stable sort, so the tie order above survives
+    return grouped.sort_values(
+        ["brand", "quantity"],
+        ascending=[True, False],
+        kind="mergesort"
+    ).drop_duplicates("brand").set_index("brand")
 
-    total_value = (
-        brand_inventory["available_quantity"] *
-        brand_inventory["unit_price"]
-    ).sum()
 
-    return total_qty, total_value
+def sales_aggregates(sales_df: pd.DataFrame, top_products=True) -> pd.DataFrame:
+    """
+    Per brand: line count, qty, money, best-selling product (name_ar)
+    and best-selling size (text after the last "-" of name_ar).
 
+    top_products=False skips the best sellers (left "" / 0) — for
+    tables that only feed totals.
+    """
 
-def apply_deal(total_sales_money, percentage, rent):
-    after_percentage = total_sales_money - (
-        total_sales_money * percentage / 100
+    totals = sales_df.groupby("brand", observed=True).agg(
+        sales_lines=("quantity", "size"),
+        sales_qty=("quantity", "sum"),
+        sales_money=("total", "sum")
     )
 
-    after_rent = after_percentage - rent
+    if top_products and "name_ar" in sales_df.columns and not sales_df.empty:
 
-    return after_percentage, after_rent
+        rows = sales_df[["brand", "name_ar", "quantity"]]
 
+        top_product = _top_per_brand(rows, "name_ar", by_name=True)
 
-def get_best_selling_product(brand_sales: pd.DataFrame):
-    if brand_sales.empty:
-        return ""
+        totals["top_product"] = top_product["name_ar"].reindex(
+            totals.index, fill_value=""
+        )
+        totals["top_product_qty"] = top_product["quantity"].reindex(
+            totals.index, fill_value=0
+        )
 
-    grouped = (
-        brand_sales
-        .groupby("product_name")["quantity"]
-        .sum()
-        .sort_values(ascending=False)
+        # Only names carrying a "-" have a size
+        text = rows["name_ar"].astype(str)
+        sized = text.str.contains("-", regex=False)
+
+        sizes = rows.loc[sized, ["brand", "quantity"]].assign(
+            size=text[sized].str.rsplit("-", n=1).str[-1].str.strip()
+        )
+
+        totals["top_size"] = _top_per_brand(
+            sizes, "size", by_name=False
+        )["size"].reindex(totals.index, fill_value="")
+
+    return _aligned(totals, totals.index, SALES_AGGREGATES)
+
+
+def inventory_aggregates(inventory_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per brand: available qty and stock value (price x qty per line).
+    """
+
+    # float64 first: price / qty may be downcast integers at ingest
+    return inventory_df.assign(
+        inventory_value=inventory_df["sale_price"].astype(float) *
+        inventory_df["available_quantity"]
+    ).groupby("brand", observed=True).agg(
+        inventory_qty=("available_quantity", "sum"),
+        inventory_value=("inventory_value", "sum")
     )
 
-    if grouped.empty:
-        return ""
 
-    return grouped.index[0]
+def brand_aggregates(sales_df: pd.DataFrame, inventory_df: pd.DataFrame,
+                     top_products=True):
+    """
+    The branch-wide brand table every report reads from — built in one
+    vectorized pass instead of per brand.
 
+    Index: brand. Brands missing on one side get zeros / "".
+    """
 
-def get_best_selling_size(brand_sales: pd.DataFrame):
-    if brand_sales.empty:
-        return ""
+    sales = sales_aggregates(sales_df, top_products)
+    inventory = inventory_aggregates(inventory_df)
 
-    size_sales = {}
+    brands = sales.index.union(inventory.index)
 
-    for _, row in brand_sales.iterrows():
-        name = str(row.get("product_name", ""))
-        qty = row.get("quantity", 0)
+    return pd.concat([
+        _aligned(sales, brands, SALES_AGGREGATES),
+        _aligned(inventory, brands, INVENTORY_AGGREGATES)
+    ], axis=1)
 
-        if "-" in name:
-            size = name.split("-")[-1].strip()
-            if size:
-                size_sales[size] = size_sales.get(size, 0) + qty
 
-    if not size_sales:
-        return ""
+def combine_aggregates(*tables) -> pd.DataFrame:
+    """
+    Brand table over several branches from their per-branch tables.
 
-    return max(size_sales, key=size_sales.get)
+    Only the additive columns are summed; top product / size need the
+    raw rows and are not part of the result.
+    """
+
+    additive = [
+        column
+        for column in {**SALES_AGGREGATES, **INVENTORY_AGGREGATES}
+        if not column.startswith("top_")
+    ]
+
+    return pd.concat(
+        [table[additive] for table in tables]
+    ).groupby(level=0).sum()
+
+
+def brand_kpis(table: pd.DataFrame, brand) -> dict:
+    """
+    One brand's row of the aggregate table as a plain dict
+    (every column present; defaults when the brand is absent).
+    """
+
+    kpis = {**SALES_AGGREGATES, **INVENTORY_AGGREGATES}
+
+    if brand in table.index:
+        kpis.update(
+            (column, table[column].at[brand]) for column in table.columns
+        )
+
+    return kpis
+
+
+def apply_deal(total_sales_money, percentage, rent):
+    after_percentage = total_sales_money - (
+        total_sales_money * percentage / 100
+    )
+
+    after_rent = after_percentage - rent
+
+    return after_percentage, after_rent
 
 
 # ✅ Status based ONLY on Inventory
@@ -0,0 +1,53 @@
+# core/merge_engine.py
+
+import pandas as pd
+
+
+def merge_branch_inventory(inv_alex: pd.DataFrame, inv_zam: pd.DataFrame):
+    """
+    Both branches' inventories outer-joined on (brand, barcode), for all
+    brands at once.
+
+    One row per product: name / price from the first branch listing it
+    (Alexandria first), alex_qty, zamalek_qty and available_quantity
+    (their total). Duplicate barcode rows within a branch are summed;
+    rows without a barcode can't be matched and stay separate.
+    """
+
+    stacked = pd.concat(
+        [
+            inv_alex.assign(alex_qty=inv_alex["available_quantity"], zamalek_qty=0),
+            inv_zam.assign(alex_qty=0, zamalek_qty=inv_zam["available_quantity"])
+        ],
+        ignore_index=True
+    )
+
+    if "barcodes" in stacked.columns:
+        barcode = stacked["barcodes"].astype(object)
+    else:
+        barcode = pd.Series(None, index=stacked.index, dtype=object)
+
+    # Unique key per barcode-less row, so they never join
+    key = barcode.where(
+        barcode.notna(),
+        "#" + pd.Series(stacked.index, index=stacked.index).astype(str)
+    )
+
+    values = [
+        column for column in stacked.columns
+        if column not in ("brand", "available_quantity", "alex_qty", "zamalek_qty")
+    ]
+
+    merged = stacked.groupby(
+        [stacked["brand"].astype(object).rename("brand"), key.rename("_key")],
+        sort=False
+    ).agg(
+        **{column: (column, "first") for column in values},
+        alex_qty=("alex_qty", "sum"),
+        zamalek_qty=("zamalek_qty", "sum")
+    ).reset_index().drop(columns="_key")
+
+    merged["available_quantity"] = merged["alex_qty"] + merged["zamalek_qty"]
+    merged["brand"] = merged["brand"].astype("category")
+
+    return merged
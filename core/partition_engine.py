@@ -0,0 +1,30 @@
+# core/partition_engine.py
+
+import numpy as np
+import pandas as pd
+
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.intp)
+
+
+def partition_by_brand(df: pd.DataFrame, column: str = "brand") -> dict:
+    """
+    Group a frame ONCE by brand.
+
+    Returns:
+        { brand: numpy array of row positions }
+    """
+
+    if df.empty or column not in df.columns:
+        return {}
+
+    return df.groupby(column, sort=False, observed=True).indices
+
+
+def brand_slice(df: pd.DataFrame, partitions: dict, brand) -> pd.DataFrame:
+    """
+    Rows of `df` belonging to `brand`, taken by position
+    (no scan of the full frame).
+    """
+
+    return df.iloc[partitions.get(brand, EMPTY_POSITIONS)]
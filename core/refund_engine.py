@@ -1,53 +1,101 @@
 # core/refund_engine.py
 
+import numpy as np
 import pandas as pd
 
 
+MATCH_KEYS = ["brand", "barcode", "quantity"]
+
+# Without them refunds can't be told apart / matched at all
+REQUIRED_COLUMNS = ["barcode", "quantity"]
+
+
 def clean_refunds(sales_df: pd.DataFrame):
     """
     Remove refund transactions (quantity < 0)
     AND their corresponding original sales.
 
+    Every refund is paired with the first still-unmatched sale of the
+    same (brand, barcode, quantity), in file order — on (barcode,
+    quantity) alone when the export has no brand column. Pairing is done in a
+    single grouped pass: the n-th refund of a key takes the n-th sale of
+    that key.
+
     Returns:
         cleaned_df,
-        refund_count,
-        removed_total_count
+        stats = {
+            "refund_count",
+            "matched_count",
+            "unmatched_count",
+            "removed_total_count"
+        }
     """
 
-    if "quantity" not in sales_df.columns or "barcode" not in sales_df.columns:
-        return sales_df.copy(), 0, 0
+    stats = {
+        "refund_count": 0,
+        "matched_count": 0,
+        "unmatched_count": 0,
+        "removed_total_count": 0
+    }
+
+    if any(col not in sales_df.columns for col in REQUIRED_COLUMNS):
+        return sales_df.copy(), stats
+
+    match_keys = [col for col in MATCH_KEYS if col in sales_df.columns]
 
     sales_df = sales_df.copy()
 
-    original_count = len(sales_df)
+    # Ingest downcasts quantity (int8 / int16) — upcast before abs(),
+    # or abs(-128) wraps around and the refund never matches
+    quantity = sales_df["quantity"].astype("float64")
 
-    # Identify refunds
-    refunds = sales_df[sales_df["quantity"] < 0]
-    refund_count = len(refunds)
+    is_refund = (quantity < 0).to_numpy()
+    refund_count = int(is_refund.sum())
 
     if refund_count == 0:
-        return sales_df, 0, 0
+        return sales_df, stats
+
+    # =====================================================
+    # MATCH KEYS (REFUNDS COMPARE ON ABSOLUTE QUANTITY)
+    # =====================================================
+
+    keys = pd.DataFrame({
+        **{col: sales_df[col].to_numpy() for col in match_keys},
+        "quantity": quantity.abs().to_numpy(),
+        "position": np.arange(len(sales_df))
+    })
+
+    refunds = keys[is_refund].dropna(subset=match_keys)
+    candidates = keys[(quantity > 0).to_numpy()].dropna(subset=match_keys)
+
+    # First-come-first-served: rank rows inside each key in file order
+    refunds = refunds.assign(
+        slot=refunds.groupby(match_keys, sort=False, observed=True).cumcount()
+    )
+    candidates = candidates.assign(
+        slot=candidates.groupby(match_keys, sort=False, observed=True).cumcount()
+    )
 
-    indices_to_remove = set(refunds.index.tolist())
+    matches = refunds.merge(
+        candidates,
+        on=match_keys + ["slot"],
+        suffixes=("_refund", "_sale")
+    )
 
-    for idx, refund_row in refunds.iterrows():
-        barcode = refund_row["barcode"]
-        refund_qty = abs(refund_row["quantity"])
-        brand = refund_row.get("brand")
+    # =====================================================
+    # DROP REFUNDS + MATCHED ORIGINAL SALES
+    # =====================================================
 
-        # Match original sale
-        matching_sales = sales_df[
-            (sales_df["barcode"] == barcode) &
-            (sales_df["quantity"] == refund_qty) &
-            (sales_df["brand"] == brand) &
-            (~sales_df.index.isin(indices_to_remove))
-        ]
+    remove_mask = is_refund.copy()
+    remove_mask[matches["position_sale"].to_numpy()] = True
 
-        if not matching_sales.empty:
-            indices_to_remove.add(matching_sales.index[0])
+    cleaned_df = sales_df.iloc[~remove_mask].copy()
 
-    cleaned_df = sales_df[~sales_df.index.isin(indices_to_remove)].copy()
+    matched_count = len(matches)
 
-    removed_total_count = original_count - len(cleaned_df)
+    stats["refund_count"] = refund_count
+    stats["matched_count"] = matched_count
+    stats["unmatched_count"] = refund_count - matched_count
+    stats["removed_total_count"] = int(remove_mask.sum())
 
-    return cleaned_df, refund_count, removed_total_count
+    return cleaned_df, stats
@@ -0,0 +1,143 @@
+# core/run_metrics.py
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+SLOWEST_BRANDS = 10
+
+MANIFEST_NAME = "run_manifest.json"
+
+
+class StageRecord:
+    """
+    One timed stage. Count rows / output bytes with add() inside the
+    `with` block; any other keyword (e.g. matched=) is a stage-specific
+    count reported next to them.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = None
+        self.output_bytes = None
+        self.counts = {}
+
+    def add(self, rows=0, output_bytes=0, **counts):
+
+        if rows:
+            self.rows = (self.rows or 0) + int(rows)
+
+        if output_bytes:
+            self.output_bytes = (self.output_bytes or 0) + int(output_bytes)
+
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + int(value)
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "seconds": round(self.seconds, 4),
+            "rows": self.rows,
+            "output_bytes": self.output_bytes,
+            **self.counts
+        }
+
+
+class RunMetrics:
+    """
+    Lightweight wall-clock instrumentation for one generation run:
+    timed stages, counters and per-brand build records.
+
+    Entering a stage name again adds to the same record, so a stage
+    can be timed piecewise inside a loop. A stage entered inside another
+    is not counted in the outer one, so stage seconds never overlap.
+    """
+
+    def __init__(self, **run_info):
+        self.run_info = run_info
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.brands = []
+        # [record, seconds spent in nested stages] of each open stage
+        self._open_stages = []
+
+    @contextmanager
+    def stage(self, name, rows=0):
+
+        record = self.stages.get(name)
+
+        if record is None:
+            record = self.stages[name] = StageRecord(name)
+
+        record.add(rows=rows)
+
+        frame = [record, 0.0]
+        self._open_stages.append(frame)
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            self._open_stages.pop()
+
+            record.seconds += elapsed - frame[1]
+
+            if self._open_stages:
+                self._open_stages[-1][1] += elapsed
+
+    def count(self, name, value=1):
+
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_brand(self, file_path, seconds, rows, output_bytes, cached=False):
+
+        self.brands.append({
+            "file_path": file_path,
+            "seconds": round(seconds, 4),
+            "rows": int(rows),
+            "output_bytes": int(output_bytes),
+            "cached": cached
+        })
+
+    def stage_table(self):
+
+        return [record.as_dict() for record in self.stages.values()]
+
+    def slowest_brands(self, limit=SLOWEST_BRANDS):
+
+        return sorted(
+            self.brands,
+            key=lambda brand: brand["seconds"],
+            reverse=True
+        )[:limit]
+
+    def to_manifest(self, slowest=SLOWEST_BRANDS):
+
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "run": self.run_info,
+            "wall_seconds": round(time.perf_counter() - self._start, 4),
+            "stages": self.stage_table(),
+            "counters": self.counters,
+            "brand_workbooks": {
+                "count": len(self.brands),
+                "cached": sum(1 for brand in self.brands if brand["cached"]),
+                "build_seconds": round(
+                    sum(brand["seconds"] for brand in self.brands), 4
+                ),
+                "output_bytes": sum(brand["output_bytes"] for brand in self.brands)
+            },
+            "slowest_brands": self.slowest_brands(slowest)
+        }
+
+    def manifest_bytes(self, slowest=SLOWEST_BRANDS):
+
+        return json.dumps(
+            self.to_manifest(slowest), indent=2, ensure_ascii=False
+        ).encode("utf-8")
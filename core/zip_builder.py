@@ -1,7 +1,23 @@
+import os
+import shutil
+import tempfile
+import time
 import zipfile
 from io import BytesIO
 
 
+# Archive stays in RAM up to this size, then spills to a temp file
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+# .xlsx files are already deflated ZIPs — compressing again only burns CPU
+ENTRY_COMPRESSION = {
+    ".xlsx": zipfile.ZIP_STORED,
+    ".json": zipfile.ZIP_DEFLATED,
+    ".txt": zipfile.ZIP_DEFLATED,
+    ".csv": zipfile.ZIP_DEFLATED,
+}
+
+
 def safe_filename(name: str):
 
     return (
@@ -13,6 +29,50 @@ def safe_filename(name: str):
     )
 
 
+def compression_for(path: str) -> int:
+
+    extension = os.path.splitext(path)[1].lower()
+
+    return ENTRY_COMPRESSION.get(extension, zipfile.ZIP_DEFLATED)
+
+
+def open_spooled_zip():
+    """
+    Returns (spool, zip_file). Close zip_file before reading spool.
+    """
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+
+    return spool, zipfile.ZipFile(spool, "w")
+
+
+def open_zip_entry(zip_file, path: str):
+    """
+    Writable stream for one archive entry, compressed per policy.
+    """
+
+    info = zipfile.ZipInfo(path, date_time=time.localtime()[:6])
+    info.compress_type = compression_for(path)
+    info.external_attr = 0o600 << 16
+
+    return zip_file.open(info, "w")
+
+
+def write_zip_entry(zip_file, path: str, data):
+    """
+    Stream bytes or a file-like object into the archive
+    without an extra in-memory copy.
+    """
+
+    with open_zip_entry(zip_file, path) as entry:
+
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            entry.write(data)
+        else:
+            data.seek(0)
+            shutil.copyfileobj(data, entry)
+
+
 def build_reports_zip(
     brand_workbooks: dict
 ):
@@ -28,7 +88,7 @@ def build_reports_zip(
 
     zip_buffer = BytesIO()
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
 
         for brand, data in brand_workbooks.items():
 
@@ -45,7 +105,7 @@ def build_reports_zip(
             else:
                 path = f"Reports/Empty Brand Guard/{safe_name}.xlsx"
 
-            zip_file.writestr(path, buffer.getvalue())
+            write_zip_entry(zip_file, path, buffer)
 
     zip_buffer.seek(0)
 
@@ -0,0 +1,372 @@
+# pipeline.py
+#
+# Report generation without the UI — used by app.py and runnable
+# headless (cron, scripts):
+#
+#   python -m pipeline --mode Zamalek --cycle "Cycle 1" \
+#       --sales sales.xlsx --inventory inventory.xlsx --deals deals.xlsx
+#
+#   python -m pipeline --mode Merged --cycle "Cycle 2" \
+#       --sales zam_sales.xlsx --inventory zam_inventory.xlsx \
+#       --alex-sales alex_sales.xlsx --alex-inventory alex_inventory.xlsx \
+#       --deals deals.xlsx --output out/merged.zip --workers 4
+
+import argparse
+import os
+import sys
+import zipfile
+
+from reports.workbook_executor import build_brand_workbooks
+from reports.metadata_sheet import generated_at_now
+from reports.sheet_writers import save_workbook
+from reports.branch_summary_workbook import (
+    build_branch_summary_workbook,
+    build_merged_summary_workbook
+)
+from core.deals_engine import load_deals_by_mode, normalize_brand_name
+from core.ingest_engine import load_sales, load_inventory, probe_columns
+from core.brand_jobs import plan_single_mode_jobs, plan_merged_mode_jobs
+from core.zip_builder import open_zip_entry, write_zip_entry
+from core.run_metrics import RunMetrics, MANIFEST_NAME
+
+
+BRANCHES = ["Zamalek", "Alexandria"]
+
+MODES = BRANCHES + ["Merged"]
+
+PAYOUT_CYCLES = ["Cycle 1", "Cycle 2"]
+
+
+class RunCancelled(Exception):
+    """
+    Raised from a progress callback to stop a run between brands.
+    """
+
+
+def zip_file_name(mode):
+
+    return f"SlotX_Reports_{mode}.zip"
+
+
+def _load_deals(deals_file, mode):
+
+    deals_dict = load_deals_by_mode(deals_file, mode)
+
+    # Normalize deal keys
+    return {normalize_brand_name(k): v for k, v in deals_dict.items()}
+
+
+# =====================================================
+# PIPELINE
+# =====================================================
+
+def write_reports(
+    zip_file,
+    mode,
+    payout_cycle,
+    sales_files,
+    inventory_files,
+    deals_file,
+    max_workers=1,
+    use_workbook_cache=True,
+    metrics=None,
+    progress=None
+):
+    """
+    Generate every report of one run into an open, writable ZipFile.
+
+    sales_files / inventory_files:
+        { branch: path or uploaded file }
+        single mode → { mode: ... }
+        Merged     → { "Zamalek": ..., "Alexandria": ... }
+
+    progress(stage, done, total) is called as each stage starts and
+    after every brand workbook (done / total brands); it may raise
+    RunCancelled to stop the run.
+
+    Returns the RunMetrics of the run (run_manifest.json is written
+    into the archive as the last entry).
+    """
+
+    def report(stage, done=0, total=0):
+        if progress is not None:
+            progress(stage, done, total)
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}' (expected one of {MODES})")
+
+    branches = BRANCHES if mode == "Merged" else [mode]
+
+    for branch in branches:
+        if sales_files.get(branch) is None or inventory_files.get(branch) is None:
+            raise ValueError(f"Sales and inventory files are required for {branch}")
+
+    if deals_file is None:
+        raise ValueError("Deals file is required")
+
+    if metrics is None:
+        metrics = RunMetrics(
+            mode=mode,
+            payout_cycle=payout_cycle,
+            max_workers=int(max_workers),
+            use_workbook_cache=use_workbook_cache
+        )
+
+    # Header row of every export first: a missing / renamed column
+    # fails here, before any export is parsed
+    report("validate")
+
+    with metrics.stage("validate"):
+        for branch in branches:
+            for kind, files in (("sales", sales_files), ("inventory", inventory_files)):
+                try:
+                    probe_columns(files[branch], kind)
+                except ValueError as e:
+                    raise ValueError(f"{branch}: {e}") from e
+
+    # Refund cleaning (its own "refunds" stage) + brand normalization
+    # happen at ingest, cached on disk by file content
+    report("ingest")
+
+    with metrics.stage("ingest") as stage:
+        sales = {}
+        inventory = {}
+
+        for branch in branches:
+            sales[branch] = load_sales(sales_files[branch], metrics)
+            inventory[branch] = load_inventory(inventory_files[branch])
+
+            stage.add(rows=len(sales[branch]) + len(inventory[branch]))
+
+    # Deals workbook is parsed once, cached by content hash
+    report("deals")
+
+    with metrics.stage("deals") as stage:
+        deal_modes = MODES if mode == "Merged" else [mode]
+        deals = {m: _load_deals(deals_file, m) for m in deal_modes}
+
+        stage.add(rows=sum(len(d) for d in deals.values()))
+
+    # One Metadata timestamp for the whole run
+    generated_at = generated_at_now()
+
+    report("planning")
+
+    with metrics.stage("planning"):
+        if mode == "Merged":
+            brand_jobs, brand_tables = plan_merged_mode_jobs(
+                payout_cycle,
+                sales["Zamalek"],
+                inventory["Zamalek"],
+                sales["Alexandria"],
+                inventory["Alexandria"],
+                deals["Zamalek"],
+                deals["Alexandria"],
+                deals["Merged"],
+                generated_at,
+                metrics
+            )
+        else:
+            brand_jobs, brand_tables = plan_single_mode_jobs(
+                mode,
+                payout_cycle,
+                sales[mode],
+                inventory[mode],
+                deals[mode],
+                generated_at,
+                metrics
+            )
+
+    metrics.count("brand_jobs", len(brand_jobs))
+
+    # =====================================================
+    # BRAND WORKBOOKS
+    # =====================================================
+
+    brands_total = len(brand_jobs)
+
+    report("brand_workbooks", 0, brands_total)
+
+    # Per-brand build time / rows / bytes are recorded by the executor.
+    # Stages don't overlap: waiting for the next workbook is
+    # brand_workbooks, writing it into the archive is zip_write.
+    builds = build_brand_workbooks(
+        brand_jobs, max_workers, use_workbook_cache, metrics
+    )
+    brands_done = 0
+
+    try:
+        while True:
+
+            with metrics.stage("brand_workbooks"):
+                built = next(builds, None)
+
+            if built is None:
+                break
+
+            file_path, workbook_bytes = built
+
+            with metrics.stage("zip_write") as stage:
+                write_zip_entry(zip_file, file_path, workbook_bytes)
+                stage.add(output_bytes=len(workbook_bytes))
+
+            brands_done += 1
+            report("brand_workbooks", brands_done, brands_total)
+    finally:
+        # Cancelled / failed runs stop the pool's pending builds
+        builds.close()
+
+    # =====================================================
+    # BRANCH SUMMARY
+    # =====================================================
+
+    report("summary_workbook", brands_total, brands_total)
+
+    with metrics.stage("summary_workbook") as stage:
+
+        if mode == "Merged":
+            # Per-branch + combined Performance from planning's tables
+            summary_wb = build_merged_summary_workbook(
+                payout_cycle,
+                brand_tables["Zamalek"],
+                brand_tables["Alexandria"],
+                deals["Zamalek"],
+                deals["Alexandria"],
+                deals["Merged"],
+                generated_at
+            )
+        else:
+            summary_wb = build_branch_summary_workbook(
+                branch_name=mode,
+                payout_cycle=payout_cycle,
+                sales_df=sales[mode],
+                inventory_df=inventory[mode],
+                deals_dict=deals[mode],
+                aggregates=brand_tables[mode],
+                generated_at=generated_at
+            )
+
+        summary_path = f"Reports/{mode}/{mode}_Summary.xlsx"
+
+        # Saved straight into the archive entry — no BytesIO copy
+        with open_zip_entry(zip_file, summary_path) as summary_entry:
+            save_workbook(summary_wb, summary_entry)
+
+        stage.add(
+            rows=sum(len(sales[b]) + len(inventory[b]) for b in branches),
+            output_bytes=zip_file.getinfo(summary_path).file_size
+        )
+
+    write_zip_entry(zip_file, MANIFEST_NAME, metrics.manifest_bytes())
+
+    return metrics
+
+
+def generate_reports_zip(output, mode, payout_cycle, sales_files,
+                         inventory_files, deals_file, **options):
+    """
+    write_reports into a new ZIP at `output` (path or binary file).
+
+    A path is written via a ".part" file and renamed when complete, so
+    a scheduled job never leaves a truncated archive behind.
+    """
+
+    if not isinstance(output, (str, os.PathLike)):
+        with zipfile.ZipFile(output, "w") as zip_file:
+            return write_reports(
+                zip_file, mode, payout_cycle, sales_files,
+                inventory_files, deals_file, **options
+            )
+
+    output = os.fspath(output)
+    directory = os.path.dirname(output)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    partial = output + ".part"
+
+    try:
+        with zipfile.ZipFile(partial, "w") as zip_file:
+            metrics = write_reports(
+                zip_file, mode, payout_cycle, sales_files,
+                inventory_files, deals_file, **options
+            )
+        os.replace(partial, output)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    return metrics
+
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Generate Slot-X sales & inventory reports (no UI)"
+    )
+
+    parser.add_argument("--mode", required=True, choices=MODES)
+    parser.add_argument("--cycle", required=True, choices=PAYOUT_CYCLES)
+    parser.add_argument("--sales", required=True,
+                        help="sales export (Zamalek's in Merged mode)")
+    parser.add_argument("--inventory", required=True,
+                        help="inventory export (Zamalek's in Merged mode)")
+    parser.add_argument("--alex-sales", help="Alexandria sales (Merged mode)")
+    parser.add_argument("--alex-inventory",
+                        help="Alexandria inventory (Merged mode)")
+    parser.add_argument("--deals", required=True)
+    parser.add_argument("--output",
+                        help="ZIP path (default: SlotX_Reports_<mode>.zip)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-workbook-cache", action="store_true",
+                        help="rebuild every brand workbook")
+
+    args = parser.parse_args(argv)
+
+    if args.mode == "Merged":
+        if not (args.alex_sales and args.alex_inventory):
+            parser.error("Merged mode needs --alex-sales and --alex-inventory")
+
+        first_branch = "Zamalek"
+        sales_files = {"Alexandria": args.alex_sales}
+        inventory_files = {"Alexandria": args.alex_inventory}
+    else:
+        first_branch = args.mode
+        sales_files = {}
+        inventory_files = {}
+
+    sales_files[first_branch] = args.sales
+    inventory_files[first_branch] = args.inventory
+
+    output = args.output or zip_file_name(args.mode)
+
+    try:
+        metrics = generate_reports_zip(
+            output,
+            args.mode,
+            args.cycle,
+            sales_files,
+            inventory_files,
+            args.deals,
+            max_workers=args.workers,
+            use_workbook_cache=not args.no_workbook_cache
+        )
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for record in metrics.stage_table():
+        print(f"{record['stage']:<18}{record['seconds']:>10.3f}s")
+
+    print(f"{len(metrics.brands)} brand workbooks → {output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# report_jobs.py
+#
+# Report generation as background jobs owned by the server process.
+# The Streamlit script only starts a job, polls it and serves its ZIP,
+# so a rerun, a dropped websocket or a page reload loses nothing:
+#
+#   job = start_job(mode, payout_cycle, sales_files, inventory_files,
+#                   deals_file, max_workers=4)
+#   get_job(job.id).progress()   # stage, brands done / total, ETA
+#   get_job(job.id).cancel()     # stops between brands
+#
+# Finished archives live in the disk cache ("jobs/<id>.zip") and stay
+# downloadable by job ID until they age out.
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import zipfile
+from io import BytesIO
+
+from pipeline import generate_reports_zip, RunCancelled
+from core.run_metrics import MANIFEST_NAME
+from utils.disk_cache import cache_dir
+from utils.file_helpers import read_file_bytes
+
+
+# Finished archives older than this are deleted when a new job starts
+JOB_MAX_AGE_SECONDS = int(
+    os.environ.get("SLOTX_JOB_MAX_AGE_SECONDS", 24 * 3600)
+)
+
+JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class ReportJob:
+    """
+    One generation run on a background thread. Status / progress are
+    plain attributes written by the job thread and read by the UI.
+    """
+
+    def __init__(self, job_id, mode, payout_cycle):
+        self.id = job_id
+        self.mode = mode
+        self.payout_cycle = payout_cycle
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.error = None
+        self.brands_done = 0
+        self.brands_total = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self._brands_started = None
+        self._cancel = threading.Event()
+
+    @property
+    def zip_path(self):
+        return os.path.join(cache_dir("jobs"), f"{self.id}.zip")
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def cancel(self):
+        """
+        Takes effect at the next stage / brand boundary.
+        """
+
+        self._cancel.set()
+
+    def _on_progress(self, stage, done, total):
+
+        if self._cancel.is_set():
+            raise RunCancelled()
+
+        self.stage = stage
+
+        if stage == "brand_workbooks" and self._brands_started is None:
+            self._brands_started = time.time()
+
+        if total:
+            self.brands_done = done
+            self.brands_total = total
+
+    def eta_seconds(self):
+        """
+        Remaining brand-build time at the average pace so far, or None.
+        """
+
+        if self.finished or not self.brands_done or self._brands_started is None:
+            return None
+
+        elapsed = time.time() - self._brands_started
+        remaining = self.brands_total - self.brands_done
+
+        return elapsed / self.brands_done * remaining
+
+    def progress(self):
+
+        return {
+            "status": self.status,
+            "stage": self.stage,
+            "brands_done": self.brands_done,
+            "brands_total": self.brands_total,
+            "elapsed_seconds": (self.finished_at or time.time()) - self.started_at,
+            "eta_seconds": self.eta_seconds(),
+            "error": self.error
+        }
+
+    def manifest(self):
+        """
+        run_manifest.json of a finished archive (stages, slowest brands).
+        """
+
+        with zipfile.ZipFile(self.zip_path) as archive:
+            return json.loads(archive.read(MANIFEST_NAME))
+
+    def _run(self, sales_files, inventory_files, deals_file, options):
+
+        self.status = RUNNING
+
+        try:
+            generate_reports_zip(
+                self.zip_path,
+                self.mode,
+                self.payout_cycle,
+                sales_files,
+                inventory_files,
+                deals_file,
+                progress=self._on_progress,
+                **options
+            )
+            self.status = DONE
+        except RunCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+        finally:
+            self.stage = self.status
+            self.finished_at = time.time()
+
+
+def _snapshot(files):
+    """
+    Uploads copied to memory — the job outlives the script run that
+    received them.
+    """
+
+    return {
+        branch: None if file is None else BytesIO(read_file_bytes(file))
+        for branch, file in files.items()
+    }
+
+
+def _remove_old_archives():
+
+    directory = cache_dir("jobs")
+    cutoff = time.time() - JOB_MAX_AGE_SECONDS
+
+    for name in os.listdir(directory):
+
+        path = os.path.join(directory, name)
+
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+    with _jobs_lock:
+        for job_id, job in list(_jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del _jobs[job_id]
+
+
+def start_job(mode, payout_cycle, sales_files, inventory_files, deals_file,
+              **options) -> ReportJob:
+    """
+    Start a generation run in the background and return its job.
+    options: write_reports options (max_workers, use_workbook_cache).
+    """
+
+    _remove_old_archives()
+
+    job = ReportJob(uuid.uuid4().hex, mode, payout_cycle)
+
+    with _jobs_lock:
+        _jobs[job.id] = job
+
+    threading.Thread(
+        target=job._run,
+        args=(
+            _snapshot(sales_files),
+            _snapshot(inventory_files),
+            None if deals_file is None else BytesIO(read_file_bytes(deals_file)),
+            options
+        ),
+        name=f"slotx-job-{job.id}",
+        daemon=True
+    ).start()
+
+    return job
+
+
+def get_job(job_id):
+    """
+    The job with this ID, or None.
+
+    A job of an earlier server process comes back as a finished job if
+    its archive is still on disk.
+    """
+
+    if not job_id or not JOB_ID.fullmatch(str(job_id)):
+        return None
+
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+
+    if job is not None:
+        return job
+
+    job = ReportJob(job_id, None, None)
+
+    if not os.path.exists(job.zip_path):
+        return None
+
+    job.status = job.stage = DONE
+    job.finished_at = os.path.getmtime(job.zip_path)
+
+    # Mode / cycle / duration from the archive's manifest
+    try:
+        manifest = job.manifest()
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+    job.mode = manifest["run"].get("mode")
+    job.payout_cycle = manifest["run"].get("payout_cycle")
+    job.started_at = job.finished_at - manifest.get("wall_seconds", 0)
+
+    with _jobs_lock:
+        _jobs.setdefault(job_id, job)
+
+    return job
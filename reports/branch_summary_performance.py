@@ -1,122 +1,87 @@
-from openpyxl.styles import Font, PatternFill, Alignment
-from utils.excel_helpers import auto_fit_columns
-from core.deals_engine import normalize_brand_name
-
+import pandas as pd
+from utils.excel_helpers import (
+    widths_from_columns,
+    set_column_widths,
+    styled_row,
+    register_styles,
+    HEADER_STYLE,
+    KPI_STYLE,
+    KPI_MONEY_STYLE
+)
+from core.deals_engine import deals_frame
+
+
+def create_performance_sheet(wb, aggregates, deals_dict):
+    """
+    aggregates: the branch's brand table from planning
+    (core.brand_jobs), so the branch isn't aggregated twice.
+    """
+
+    write_performance_sheet(
+        wb, "Performance", performance_frame(aggregates, deals_dict)
+    )
 
-def create_performance_sheet(
-    wb,
-    branch_name,
-    payout_cycle,
-    sales_df,
-    inventory_df,
-    deals_dict
-):
 
-    ws = wb.create_sheet("Performance")
+def performance_frame(aggregates, deals_dict):
+    """
+    Ranked performance rows (brands with sales) from a brand aggregate
+    table (core.kpi_engine), with deal deductions applied.
+    """
 
     # =====================================================
-    # 🔥 IMPORTANT FIX — NORMALIZE BEFORE GROUPING
+    # BRAND AGGREGATES (brands with sales only)
     # =====================================================
 
-    sales_df = sales_df.copy()
-    inventory_df = inventory_df.copy()
-
-    sales_df["brand_original"] = sales_df["brand"]
-    inventory_df["brand_original"] = inventory_df["brand"]
-
-    sales_df["brand"] = sales_df["brand"].astype(str).apply(normalize_brand_name)
-    inventory_df["brand"] = inventory_df["brand"].astype(str).apply(normalize_brand_name)
+    summary_df = aggregates[aggregates["sales_lines"] > 0].copy()
 
-    # =====================================================
-    # GROUP SALES PER BRAND
-    # =====================================================
+    # Brands are normalized at ingest — the name shown is the key itself
+    summary_df.index = summary_df.index.astype(str)
+    summary_df["brand_original"] = summary_df.index
 
-    sales_grouped = (
-        sales_df.groupby("brand")
-        .agg({
-            "quantity": "sum",
-            "total": "sum",
-            "brand_original": "first"
-        })
-        .reset_index()
-    )
+    summary_df = summary_df.rename_axis("brand").reset_index().rename(columns={
+        "sales_qty": "quantity",
+        "sales_money": "total",
+        "inventory_qty": "available_quantity"
+    })
 
-    sales_grouped = sales_grouped.sort_values(
+    summary_df = summary_df.sort_values(
         by="total",
         ascending=False
     ).reset_index(drop=True)
 
-    sales_grouped["Rank"] = sales_grouped.index + 1
+    summary_df["Rank"] = summary_df.index + 1
 
     # =====================================================
-    # GROUP INVENTORY PER BRAND
-    # =====================================================
-
-    inventory_grouped = (
-        inventory_df.groupby("brand")
-        .agg({
-            "available_quantity": "sum",
-            "sale_price": "mean"
-        })
-        .reset_index()
-    )
-
-    inventory_grouped["inventory_value"] = (
-        inventory_grouped["available_quantity"] *
-        inventory_grouped["sale_price"]
-    )
-
-    # =====================================================
-    # MERGE ON NORMALIZED BRAND
+    # APPLY DEALS (SMART MATCHING)
     # =====================================================
 
-    summary_df = sales_grouped.merge(
-        inventory_grouped,
+    # Brands without a deal get 0% / 0 rent
+    summary_df = summary_df.merge(
+        deals_frame(deals_dict),
         on="brand",
         how="left"
     )
 
-    summary_df["available_quantity"] = summary_df["available_quantity"].fillna(0)
-    summary_df["inventory_value"] = summary_df["inventory_value"].fillna(0)
+    percentage = summary_df["percentage"].fillna(0)
+    rent = summary_df["rent"].fillna(0)
 
-    # =====================================================
-    # APPLY DEALS (SMART MATCHING)
-    # =====================================================
-
-    after_percentage_list = []
-    after_rent_list = []
-    after_all_list = []
-    percentage_deduction_list = []
-    rent_deduction_list = []
-
-    for _, row in summary_df.iterrows():
-
-        normalized_brand = row["brand"]
-        sales_money = row["total"]
-
-        deal = deals_dict.get(
-            normalized_brand,
-            {"percentage": 0, "rent": 0}
-        )
+    summary_df["percentage_deduction"] = summary_df["total"] * (percentage / 100)
+    summary_df["rent_deduction"] = rent
+    summary_df["after_percentage"] = (
+        summary_df["total"] - summary_df["percentage_deduction"]
+    )
+    summary_df["after_rent"] = summary_df["after_percentage"] - rent
+    summary_df["after_all"] = summary_df["after_rent"]
 
-        percentage = deal["percentage"]
-        rent = deal["rent"]
+    return summary_df
 
-        percentage_deduction = sales_money * (percentage / 100)
-        after_percentage = sales_money - percentage_deduction
-        after_rent = after_percentage - rent
 
-        percentage_deduction_list.append(percentage_deduction)
-        rent_deduction_list.append(rent)
-        after_percentage_list.append(after_percentage)
-        after_rent_list.append(after_rent)
-        after_all_list.append(after_rent)
+def write_performance_sheet(wb, title, summary_df):
+    """
+    KPI cards + ranked brand table for one performance_frame.
+    """
 
-    summary_df["percentage_deduction"] = percentage_deduction_list
-    summary_df["rent_deduction"] = rent_deduction_list
-    summary_df["after_percentage"] = after_percentage_list
-    summary_df["after_rent"] = after_rent_list
-    summary_df["after_all"] = after_all_list
+    ws = wb.create_sheet(title)
 
     # =====================================================
     # KPI CARDS
@@ -128,12 +93,6 @@ def create_performance_sheet(
     total_after_all = summary_df["after_all"].sum()
     total_deductions = total_percentage_deduction + total_rent_deduction
 
-    kpi_fill = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
-
     kpi_titles = [
         "Total Branch Sales",
         "Total % Deducted",
@@ -150,32 +109,6 @@ def create_performance_sheet(
         total_after_all
     ]
 
-    for i, (title, value) in enumerate(zip(kpi_titles, kpi_values)):
-
-        col_letter = chr(65 + i)
-
-        ws[f"{col_letter}1"] = title
-        ws[f"{col_letter}2"] = value
-
-        ws[f"{col_letter}1"].fill = kpi_fill
-        ws[f"{col_letter}2"].fill = kpi_fill
-
-        ws[f"{col_letter}1"].font = Font(bold=True, color="FFFFFF")
-        ws[f"{col_letter}2"].font = Font(bold=True, color="FFFFFF")
-
-        ws[f"{col_letter}1"].alignment = Alignment(horizontal="center")
-        ws[f"{col_letter}2"].alignment = Alignment(horizontal="center")
-
-        ws[f"{col_letter}2"].number_format = '#,##0.00 "EGP"'
-        ws.column_dimensions[col_letter].width = 26
-
-    # =====================================================
-    # PERFORMANCE TABLE
-    # =====================================================
-
-    ws.append([])
-    ws.append([])
-
     headers = [
         "Rank",
         "Brand",
@@ -188,33 +121,45 @@ def create_performance_sheet(
         "Inventory Value"
     ]
 
-    ws.append(headers)
+    table_columns = [
+        "Rank",
+        "brand_original",  # 🔥 show original name
+        "quantity",
+        "total",
+        "after_percentage",
+        "after_rent",
+        "after_all",
+        "available_quantity",
+        "inventory_value"
+    ]
 
-    header_row = ws.max_row
+    # =====================================================
+    # COLUMN WIDTHS (before any row is streamed)
+    # =====================================================
 
-    header_fill = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
+    width_columns = []
+
+    for i, column in enumerate(table_columns):
+        kpi_cells = [kpi_titles[i], kpi_values[i]] if i < len(kpi_titles) else []
+        width_columns.append(
+            pd.concat([pd.Series(kpi_cells, dtype=object), summary_df[column]])
+        )
+
+    set_column_widths(ws, widths_from_columns(headers, width_columns))
+
+    register_styles(wb)
+
+    ws.append(styled_row(ws, kpi_titles, style=KPI_STYLE))
+    ws.append(styled_row(ws, kpi_values, style=KPI_MONEY_STYLE))
+
+    # =====================================================
+    # PERFORMANCE TABLE
+    # =====================================================
+
+    ws.append([])
+    ws.append([])
+
+    ws.append(styled_row(ws, headers, style=HEADER_STYLE))
 
-    for col in range(1, len(headers) + 1):
-        cell = ws.cell(row=header_row, column=col)
-        cell.fill = header_fill
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.alignment = Alignment(horizontal="center")
-
-    for _, row in summary_df.iterrows():
-        ws.append([
-            row["Rank"],
-            row["brand_original"],  # 🔥 show original name
-            row["quantity"],
-            row["total"],
-            row["after_percentage"],
-            row["after_rent"],
-            row["after_all"],
-            row["available_quantity"],
-            row["inventory_value"]
-        ])
-
-    auto_fit_columns(ws)
+    for row in summary_df[table_columns].itertuples(index=False):
+        ws.append(list(row))
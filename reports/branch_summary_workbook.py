@@ -1,13 +1,28 @@
+import warnings
+
+import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
 
-from reports.branch_summary_performance import create_performance_sheet
+from reports.branch_summary_performance import (
+    create_performance_sheet,
+    performance_frame,
+    write_performance_sheet
+)
 from reports.metadata_sheet import create_metadata_sheet
 from reports.sales_sheet import create_sales_sheet
 from reports.inventory_sheet import create_inventory_sheet
 
-from utils.excel_helpers import auto_fit_columns
+from core.kpi_engine import combine_aggregates
+from core.brand_jobs import merged_branch_type
+
+from utils.excel_helpers import (
+    widths_from_columns,
+    set_column_widths,
+    styled_row,
+    register_styles,
+    HEADER_STYLE
+)
 
 
 def build_branch_summary_workbook(
@@ -15,13 +30,19 @@ def build_branch_summary_workbook(
     payout_cycle,
     sales_df,
     inventory_df,
-    deals_dict
+    deals_dict,
+    aggregates,
+    generated_at=None
 ):
+    """
+    aggregates: the branch's brand table from planning (core.brand_jobs).
+    """
 
-    wb = Workbook()
+    # Write-only: every sheet is streamed row by row, so memory stays
+    # flat no matter how many sales/inventory rows the branch has
+    wb = Workbook(write_only=True)
 
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
+    register_styles(wb)
 
     # =====================================================
     # ALL SALES
@@ -50,28 +71,25 @@ def build_branch_summary_workbook(
     ws_deals = wb.create_sheet("Deals")
 
     headers = ["Brand", "Deal %", "Rent (EGP)"]
-    ws_deals.append(headers)
 
-    header_fill = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
+    deal_rows = [
+        [brand, deal.get("percentage", 0), deal.get("rent", 0)]
+        for brand, deal in deals_dict.items()
+    ]
 
-    for col in range(1, 4):
-        cell = ws_deals.cell(row=1, column=col)
-        cell.fill = header_fill
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.alignment = Alignment(horizontal="center")
+    deals_frame = pd.DataFrame(deal_rows, columns=headers)
 
-    for brand, deal in deals_dict.items():
-        ws_deals.append([
-            brand,
-            deal.get("percentage", 0),
-            deal.get("rent", 0)
-        ])
+    set_column_widths(ws_deals, widths_from_columns(
+        headers,
+        [deals_frame[col] for col in headers]
+    ))
 
-    last_row = ws_deals.max_row
+    ws_deals.append(styled_row(ws_deals, headers, style=HEADER_STYLE))
+
+    for deal_row in deal_rows:
+        ws_deals.append(deal_row)
+
+    last_row = len(deal_rows) + 1
 
     # Apply table style
     table = Table(
@@ -85,22 +103,25 @@ def build_branch_summary_workbook(
     )
 
     table.tableStyleInfo = style
-    ws_deals.add_table(table)
 
-    auto_fit_columns(ws_deals)
+    # Write-only sheets can't read headings back from cells
+    table.tableColumns = [
+        TableColumn(id=index, name=header)
+        for index, header in enumerate(headers, 1)
+    ]
+
+    # openpyxl warns on every write-only add_table, columns set or not
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore", message="In write-only mode you must add table columns"
+        )
+        ws_deals.add_table(table)
 
     # =====================================================
     # PERFORMANCE TAB (Renamed Properly)
     # =====================================================
 
-    create_performance_sheet(
-        wb=wb,
-        branch_name=branch_name,
-        payout_cycle=payout_cycle,
-        sales_df=sales_df,
-        inventory_df=inventory_df,
-        deals_dict=deals_dict
-    )
+    create_performance_sheet(wb, aggregates, deals_dict)
 
     # =====================================================
     # METADATA
@@ -110,7 +131,102 @@ def build_branch_summary_workbook(
         wb,
         f"{branch_name} Summary",
         branch_name,
-        payout_cycle
+        payout_cycle,
+        generated_at
+    )
+
+    return wb
+
+
+def combined_deals(zam_table, alex_table, deals_zam, deals_alex, deals_merged):
+    """
+    Each brand's deal as its merged-mode brand workbook applies it:
+    the tab of the branch(es) holding its stock (merged_branch_type).
+    Brands stocked nowhere have no workbook and keep the Merged deal.
+    """
+
+    deals_by_type = {
+        "Merged": deals_merged,
+        "Zamalek": deals_zam,
+        "Alexandria": deals_alex
+    }
+
+    brands = zam_table.index.union(alex_table.index)
+    zam_qty = zam_table["inventory_qty"].reindex(brands, fill_value=0)
+    alex_qty = alex_table["inventory_qty"].reindex(brands, fill_value=0)
+
+    deals = {}
+
+    for brand in brands:
+
+        branch_type = merged_branch_type(zam_qty.at[brand], alex_qty.at[brand])
+        deals_dict = deals_by_type.get(branch_type, deals_merged)
+
+        if brand in deals_dict:
+            deals[brand] = deals_dict[brand]
+
+    return deals
+
+
+def build_merged_summary_workbook(
+    payout_cycle,
+    zam_table,
+    alex_table,
+    deals_zam,
+    deals_alex,
+    deals_merged,
+    generated_at=None
+):
+    """
+    Merged-mode summary: one Performance table per branch plus a
+    combined one.
+
+    zam_table / alex_table: the per-branch brand tables from planning
+    (core.brand_jobs); the combined table is their sum, each brand
+    with the deal its brand workbook uses (see combined_deals).
+    """
+
+    wb = Workbook(write_only=True)
+
+    register_styles(wb)
+
+    # =====================================================
+    # PERFORMANCE TABS
+    # =====================================================
+
+    write_performance_sheet(
+        wb,
+        "Zamalek Performance",
+        performance_frame(zam_table, deals_zam)
+    )
+
+    write_performance_sheet(
+        wb,
+        "Alexandria Performance",
+        performance_frame(alex_table, deals_alex)
+    )
+
+    write_performance_sheet(
+        wb,
+        "Combined Performance",
+        performance_frame(
+            combine_aggregates(zam_table, alex_table),
+            combined_deals(
+                zam_table, alex_table, deals_zam, deals_alex, deals_merged
+            )
+        )
+    )
+
+    # =====================================================
+    # METADATA
+    # =====================================================
+
+    create_metadata_sheet(
+        wb,
+        "Merged Summary",
+        "Merged",
+        payout_cycle,
+        generated_at
     )
 
-    return wb
\ No newline at end of file
+    return wb
@@ -1,39 +1,44 @@
-from openpyxl.styles import Font, PatternFill, Alignment
-from utils.excel_helpers import auto_fit_columns
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
 
+from reports.sheet_writers import sheet_writer, column_rows
+from utils.excel_helpers import (
+    widths_from_columns,
+    register_styles,
+    HEADER_STYLE,
+    QUANTITY_STYLE,
+    MONEY_STYLE
+)
 
-def get_status(qty):
-
-    if qty <= 2:
-        return "Critical"
-    elif qty <= 5:
-        return "Low"
-    elif qty <= 10:
-        return "Medium"
-    else:
-        return "Good"
 
+# Stock status by quantity: <= 2, <= 5, <= 10, above
+STATUS_BINS = [-np.inf, 2, 5, 10, np.inf]
 
-def get_note(status):
+STATUS_LABELS = ["Critical", "Low", "Medium", "Good"]
 
-    if status == "Critical":
-        return "Brand requires urgent restocking"
+STATUS_NOTES = {
+    "Critical": "Brand requires urgent restocking",
+    "Low": "Stock level is low – restock recommended",
+    "Medium": "Stock level is moderate – monitor movement",
+    "Good": "Stock level is healthy"
+}
 
-    elif status == "Low":
-        return "Stock level is low – restock recommended"
 
-    elif status == "Medium":
-        return "Stock level is moderate – monitor movement"
+def stock_status(qty: pd.Series) -> pd.Series:
+    """
+    Categorical status per quantity (vectorized with pd.cut).
+    """
 
-    elif status == "Good":
-        return "Stock level is healthy"
-
-    return ""
+    return pd.cut(qty, bins=STATUS_BINS, labels=STATUS_LABELS)
 
 
 def create_inventory_sheet(wb, brand_inventory, mode):
+    """
+    One row per product with its stock status.
+    """
 
-    ws = wb.create_sheet("Inventory")
+    writer = sheet_writer(wb, "Inventory")
 
     is_merged = mode.lower() == "merged"
 
@@ -58,103 +63,72 @@ def create_inventory_sheet(wb, brand_inventory, mode):
             "Notes"
         ]
 
-    ws.append(headers)
-
-    # =========================
-    # HEADER STYLE (Same as Sales)
-    # =========================
-
-    header_fill = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
-
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.alignment = Alignment(horizontal="center")
-
-    # =========================
-    # DATA ROWS
-    # =========================
-
-    for _, row in brand_inventory.iterrows():
+    register_styles(wb)
 
-        product = row.get("name_en", "")
-        barcode = row.get("barcodes", "")
-        price = float(row.get("sale_price", 0) or 0)
+    def source(column):
+        return brand_inventory.get(
+            column,
+            pd.Series("", index=brand_inventory.index, dtype=object)
+        )
 
-        if is_merged:
+    def numeric(column):
+        return pd.to_numeric(
+            brand_inventory.get(
+                column, pd.Series(0.0, index=brand_inventory.index)
+            ),
+            errors="coerce"
+        ).fillna(0).astype(float)
 
-            alex = float(row.get("alex_qty", 0) or 0)
-            zam = float(row.get("zamalek_qty", 0) or 0)
-            total = float(row.get("available_quantity", 0) or 0)
+    price = numeric("sale_price")
+    total_qty = numeric("available_quantity")
 
-            status = get_status(total)
-            note = get_note(status)
+    statuses = stock_status(total_qty)
+    notes = statuses.map(STATUS_NOTES)
 
-            ws.append([
-                product,
-                barcode,
-                price,
-                alex,
-                zam,
-                total,
-                status,
-                note
-            ])
+    qty_columns = [total_qty]
 
-        else:
-
-            qty = float(row.get("available_quantity", 0) or 0)
-            status = get_status(qty)
-            note = get_note(status)
-
-            ws.append([
-                product,
-                barcode,
-                price,
-                qty,
-                status,
-                note
-            ])
-
-    last_row = ws.max_row
+    if is_merged:
+        qty_columns = [numeric("alex_qty"), numeric("zamalek_qty"), total_qty]
+
+    writer.set_widths(widths_from_columns(headers, [
+        source("name_en"),
+        source("barcodes"),
+        price,
+        *qty_columns,
+        statuses.astype(object),
+        notes.astype(object)
+    ]))
+
+    # Price column with currency, then quantity columns; text cells
+    # carry no style at all
+    column_styles = (
+        [None, None, MONEY_STYLE] +
+        [QUANTITY_STYLE] * len(qty_columns) +
+        [None, None]
+    )
 
-    # =========================
-    # ZEBRA STYLE
-    # =========================
+    writer.set_column_styles(column_styles)
 
-    stripe_fill = PatternFill(
-        start_color="E9EEF7",
-        end_color="E9EEF7",
-        fill_type="solid"
-    )
+    # Data rows striped by one conditional-format rule
+    if len(brand_inventory):
+        writer.stripe_rows(
+            f"A2:{get_column_letter(len(headers))}{len(brand_inventory) + 1}"
+        )
 
-    for row in range(2, last_row + 1):
-        if row % 2 == 0:
-            for col in range(1, ws.max_column + 1):
-                ws.cell(row=row, column=col).fill = stripe_fill
+    writer.append(headers, style=HEADER_STYLE)
 
     # =========================
-    # NUMBER FORMATTING
+    # DATA ROWS
     # =========================
 
-    # Price column with currency
-    for row in ws.iter_rows(min_row=2, min_col=3, max_col=3):
-        for cell in row:
-            cell.number_format = '#,##0.00 "EGP"'
-
-    # Quantity columns
-    if is_merged:
-        qty_cols = [4, 5, 6]
-    else:
-        qty_cols = [4]
-
-    for col in qty_cols:
-        for row in ws.iter_rows(min_row=2, min_col=col, max_col=col):
-            for cell in row:
-                cell.number_format = '#,##0'
-
-    auto_fit_columns(ws)
+    columns = [
+        source("name_en"),
+        source("barcodes"),
+        price,
+        *qty_columns,
+        statuses.astype(object),
+        notes.astype(object)
+    ]
+
+    for values in column_rows(columns):
+        writer.append(values, column_styles=column_styles)
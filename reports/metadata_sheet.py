@@ -1,69 +1,78 @@
-from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 
+from utils.excel_helpers import (
+    styled_row,
+    register_styles,
+    BANNER_STYLE,
+    TITLE_STYLE,
+    LABEL_STYLE
+)
 
-def create_metadata_sheet(wb, report_title, branch_name, payout_cycle):
 
-    ws = wb.create_sheet("Metadata")
+GENERATED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-    # =========================================
-    # HEADER BACKGROUND (Dark Blue)
-    # =========================================
 
-    dark_blue = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
+def generated_at_now():
 
-    for row in range(1, 6):
-        for col in range(1, 5):
-            ws.cell(row=row, column=col).fill = dark_blue
+    return datetime.now().strftime(GENERATED_AT_FORMAT)
+
+
+def create_metadata_sheet(
+    wb,
+    report_title,
+    branch_name,
+    payout_cycle,
+    generated_at=None
+):
+
+    ws = wb.create_sheet("Metadata")
+
+    # Banner, title and label styles come from the shared registry
+    register_styles(wb)
+
+    # Widths must be set before rows are streamed (write-only sheets)
+    for col in range(1, 5):
+        ws.column_dimensions[get_column_letter(col)].width = 22
 
     # =========================================
     # SLOT-X TEXT (Centered & Large)
     # =========================================
 
-    ws.merge_cells("A1:E5")
+    for row in range(1, 6):
+
+        cells = styled_row(ws, [None] * 4, style=BANNER_STYLE)
+
+        if row == 1:
+            cells[0].value = "SLOT-X"
+            cells[0].style = TITLE_STYLE
 
-    title_cell = ws["A1"]
-    title_cell.value = "SLOT-X"
+        ws.append(cells)
 
-    title_cell.font = Font(
-        name="Arial Black",   # أقرب شكل للفونت اللي كان ظاهر
-        size=40,
-        bold=True,
-        color="FFFFFF"
-    )
+    if hasattr(ws, "merge_cells"):
+        ws.merge_cells("A1:E5")
+    else:
+        # write-only worksheets only keep the merged range list
+        ws.merged_cells.add("A1:E5")
 
-    title_cell.alignment = Alignment(
-        horizontal="center",
-        vertical="center"
-    )
+    ws.append([])
 
     # =========================================
     # METADATA CONTENT
     # =========================================
 
-    start_row = 7
-
     metadata = [
         ("Powered by:", "Slot-X Solutions"),
         ("Version:", "v2.0"),
         ("Report Type:", branch_name),
         ("Payout Cycle:", payout_cycle),
-        ("Generated At:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        ("Generated At:", generated_at or generated_at_now()),
     ]
 
-    for i, (label, value) in enumerate(metadata):
-        row = start_row + i
-
-        ws[f"A{row}"] = label
-        ws[f"A{row}"].font = Font(bold=True)
-
-        ws[f"B{row}"] = value
+    for label, value in metadata:
 
-    # Auto width
-    for col in range(1, 5):
-        ws.column_dimensions[get_column_letter(col)].width = 22
+        ws.append(styled_row(
+            ws,
+            [label, value],
+            column_styles=[LABEL_STYLE, None]
+        ))
@@ -1,44 +1,15 @@
-from openpyxl.styles import Font, PatternFill, Alignment
-from utils.excel_helpers import auto_fit_columns
+import pandas as pd
+from utils.excel_helpers import (
+    widths_from_frame,
+    set_column_widths,
+    register_styles,
+    KPI_STYLE,
+    KPI_MONEY_STYLE,
+    LABEL_STYLE,
+    MONEY_STYLE
+)
 from core.deals_engine import normalize_brand_name
-
-
-def extract_best_selling_product(brand_sales):
-
-    if brand_sales.empty:
-        return "", 0
-
-    grouped = (
-        brand_sales.groupby("name_ar")["quantity"]
-        .sum()
-        .sort_values(ascending=False)
-    )
-
-    if grouped.empty:
-        return "", 0
-
-    return grouped.index[0], grouped.iloc[0]
-
-
-def extract_best_selling_size(brand_sales):
-
-    if brand_sales.empty:
-        return ""
-
-    size_sales = {}
-
-    for _, row in brand_sales.iterrows():
-        product_name = str(row.get("name_ar", ""))
-        qty = row.get("quantity", 0)
-
-        if "-" in product_name:
-            size = product_name.split("-")[-1].strip()
-            size_sales[size] = size_sales.get(size, 0) + qty
-
-    if not size_sales:
-        return ""
-
-    return max(size_sales, key=size_sales.get)
+from core.kpi_engine import brand_aggregates, brand_kpis
 
 
 def format_brand_deal(percentage, rent):
@@ -60,28 +31,36 @@ def create_report_sheet(
     payout_cycle,
     brand_sales,
     brand_inventory,
-    deals_dict
+    deals_dict,
+    kpis=None
 ):
+    """
+    kpis: this brand's row of the branch aggregate table
+    (core.kpi_engine). Computed from the slices when not given.
+    """
 
     ws = wb.create_sheet("Report")
 
+    register_styles(wb)
+
     # =========================
     # CALCULATIONS
     # =========================
 
-    total_sales_qty = brand_sales["quantity"].sum() if not brand_sales.empty else 0
-    total_sales_money = brand_sales["total"].sum() if not brand_sales.empty else 0
+    if kpis is None:
+        kpis = brand_kpis(
+            brand_aggregates(
+                brand_sales.assign(brand=brand_name),
+                brand_inventory.assign(brand=brand_name)
+            ),
+            brand_name
+        )
 
-    if not brand_inventory.empty:
-        total_inventory_qty = brand_inventory["available_quantity"].sum()
+    total_sales_qty = kpis["sales_qty"]
+    total_sales_money = kpis["sales_money"]
 
-        total_inventory_value = (
-            brand_inventory["sale_price"] *
-            brand_inventory["available_quantity"]
-        ).sum()
-    else:
-        total_inventory_qty = 0
-        total_inventory_value = 0
+    total_inventory_qty = kpis["inventory_qty"]
+    total_inventory_value = kpis["inventory_value"]
 
     # 🔥🔥🔥 FIX HERE 🔥🔥🔥
     normalized_brand = normalize_brand_name(brand_name)
@@ -93,8 +72,9 @@ def create_report_sheet(
     after_percentage = total_sales_money - (total_sales_money * percentage / 100)
     after_rent = after_percentage - rent
 
-    best_product, best_qty = extract_best_selling_product(brand_sales)
-    best_size = extract_best_selling_size(brand_sales)
+    best_product = kpis["top_product"]
+    best_qty = kpis["top_product_qty"]
+    best_size = kpis["top_size"]
 
     deal_text = format_brand_deal(percentage, rent)
 
@@ -102,12 +82,6 @@ def create_report_sheet(
     # KPI CARDS (START A1)
     # =========================
 
-    kpi_fill = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
-
     ws["A1"] = "Total Sales"
     ws["A2"] = total_sales_money
 
@@ -116,19 +90,8 @@ def create_report_sheet(
 
     for col in ["A", "B"]:
 
-        ws[f"{col}1"].font = Font(color="FFFFFF", bold=True)
-        ws[f"{col}2"].font = Font(color="FFFFFF", bold=True)
-
-        ws[f"{col}1"].alignment = Alignment(horizontal="center")
-        ws[f"{col}2"].alignment = Alignment(horizontal="center")
-
-        ws[f"{col}1"].fill = kpi_fill
-        ws[f"{col}2"].fill = kpi_fill
-
-        ws.column_dimensions[col].width = 22
-
-    ws["A2"].number_format = '#,##0.00 "EGP"'
-    ws["B2"].number_format = '#,##0.00 "EGP"'
+        ws[f"{col}1"].style = KPI_STYLE
+        ws[f"{col}2"].style = KPI_MONEY_STYLE
 
     # =========================
     # DETAILS SECTION
@@ -159,7 +122,7 @@ def create_report_sheet(
         ws[f"A{row}"] = label
         ws[f"B{row}"] = value
 
-        ws[f"A{row}"].font = Font(bold=True)
+        ws[f"A{row}"].style = LABEL_STYLE
 
         if label in [
             "Total Inventory Value:",
@@ -167,8 +130,15 @@ def create_report_sheet(
             "After Percentage:",
             "After Rent:"
         ]:
-            ws[f"B{row}"].number_format = '#,##0.00 "EGP"'
+            ws[f"B{row}"].style = MONEY_STYLE
 
         row += 1
 
-    auto_fit_columns(ws)
+    # Widths straight from the values written above — no cell walk
+    layout = pd.DataFrame(
+        [[total_sales_money, total_inventory_value]] + details,
+        columns=["Total Sales", "Inventory Value"]
+    )
+
+    set_column_widths(ws, widths_from_frame(layout))
+
@@ -1,10 +1,20 @@
-from openpyxl.styles import Font, PatternFill, Alignment
-from utils.excel_helpers import auto_fit_columns
+import pandas as pd
+from reports.sheet_writers import sheet_writer, column_rows
+from utils.excel_helpers import (
+    widths_from_columns,
+    register_styles,
+    HEADER_STYLE,
+    QUANTITY_STYLE,
+    MONEY_STYLE
+)
 
 
 def create_sales_sheet(wb, brand_sales, mode):
+    """
+    One row per sale line plus a total row.
+    """
 
-    ws = wb.create_sheet("Sales")
+    writer = sheet_writer(wb, "Sales")
 
     headers = [
         "Branch",
@@ -15,76 +25,86 @@ def create_sales_sheet(wb, brand_sales, mode):
         "Total Price"
     ]
 
-    ws.append(headers)
+    register_styles(wb)
+
+    # Number format per column; text cells carry no style at all
+    column_styles = [None, None, None, None, QUANTITY_STYLE, MONEY_STYLE]
+
+    # =========================
+    # LAYOUT (before any row is streamed)
+    # =========================
+
+    def source(column, default=""):
+        return brand_sales.get(
+            column,
+            pd.Series(default, index=brand_sales.index, dtype=object)
+        )
+
+    quantity = pd.to_numeric(source("quantity", 0), errors="coerce").fillna(0)
+    money = pd.to_numeric(source("total", 0), errors="coerce").fillna(0)
+
+    total_qty = quantity.sum()
+    total_money = money.sum()
+
+    # name_ar unless empty, then name_en (same fallback as `a or b or ""`)
+    product = source("name_en")
+    product = product.where(product.astype(bool), "")
+
+    if "name_ar" in brand_sales.columns:
+        product = brand_sales["name_ar"].where(
+            brand_sales["name_ar"].astype(bool), product
+        )
+
+    writer.set_widths(widths_from_columns(headers, [
+        pd.Series([mode]),
+        source("brand"),
+        product,
+        source("barcode"),
+        pd.concat([
+            quantity.astype(float),
+            pd.Series([f"Total={int(total_qty)}"])
+        ]),
+        pd.concat([
+            money.astype(float),
+            pd.Series([f"Total={total_money:,.2f} EGP"])
+        ])
+    ]))
 
-    # HEADER STYLE (same as inventory)
-    header_fill = PatternFill(
-        start_color="0A1F5C",
-        end_color="0A1F5C",
-        fill_type="solid"
-    )
+    writer.set_column_styles(column_styles)
 
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.alignment = Alignment(horizontal="center")
-
-    total_qty = 0
-    total_money = 0
-
-    for _, row in brand_sales.iterrows():
-
-        # 👇 نفس الأعمدة القديمة بدون تغيير
-        product = row.get("name_ar") or row.get("name_en") or ""
-        barcode = row.get("barcode", "")
-        qty = float(row.get("quantity", 0) or 0)
-        total = float(row.get("total", 0) or 0)
-        brand = row.get("brand", "")
-
-        total_qty += qty
-        total_money += total
-
-        ws.append([
-            mode,
-            brand,
-            product,
-            barcode,
-            qty,
-            total
-        ])
+    # Data rows + total row, striped by one conditional-format rule
+    writer.stripe_rows(f"A2:F{len(brand_sales) + 2}")
 
-    # TOTAL ROW (inside table)
-    ws.append([
-        "",
-        "",
-        "",
-        "",
-        f"Total={int(total_qty)}",
-        f"Total={total_money:,.2f} EGP"
-    ])
-
-    last_row = ws.max_row
-
-    # Zebra style (same as inventory)
-    stripe_fill = PatternFill(
-        start_color="E9EEF7",
-        end_color="E9EEF7",
-        fill_type="solid"
-    )
+    # =========================
+    # HEADER
+    # =========================
 
-    for r in range(2, last_row + 1):
-        if r % 2 == 0:
-            for c in range(1, ws.max_column + 1):
-                ws.cell(row=r, column=c).fill = stripe_fill
+    writer.append(headers, style=HEADER_STYLE)
 
-    # Quantity format
-    for row in ws.iter_rows(min_row=2, max_row=last_row-1, min_col=5, max_col=5):
-        for cell in row:
-            cell.number_format = '#,##0'
+    # =========================
+    # DATA ROWS
+    # =========================
 
-    # Price format
-    for row in ws.iter_rows(min_row=2, max_row=last_row-1, min_col=6, max_col=6):
-        for cell in row:
-            cell.number_format = '#,##0.00 "EGP"'
+    columns = [
+        pd.Series(mode, index=brand_sales.index, dtype=object),
+        source("brand"),
+        product,
+        source("barcode"),
+        quantity.astype(float),
+        money.astype(float)
+    ]
+
+    for values in column_rows(columns):
+        writer.append(values, column_styles=column_styles)
 
-    auto_fit_columns(ws)
\ No newline at end of file
+    # TOTAL ROW (inside table)
+    writer.append(
+        [
+            "",
+            "",
+            "",
+            "",
+            f"Total={int(total_qty)}",
+            f"Total={total_money:,.2f} EGP"
+        ]
+    )
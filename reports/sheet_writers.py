@@ -0,0 +1,459 @@
+# reports/sheet_writers.py
+#
+# Writer backends for the data-heavy sheets (Sales / Inventory).
+#
+#   "openpyxl" (default) — every value becomes an openpyxl cell
+#   "xml"                — rows are streamed as SpreadsheetML into a
+#                          temp file and spliced into the saved package
+#                          with a shared-strings table
+#
+# Pick the backend with SLOTX_SHEET_WRITER. Workbooks holding streamed
+# sheets must be saved with save_workbook() (works for any workbook).
+
+import math
+import numbers
+import os
+import re
+import shutil
+import tempfile
+import weakref
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+
+from utils.excel_helpers import (
+    set_column_widths,
+    set_column_styles,
+    stripe_rows,
+    styled_row,
+    register_styles,
+    HEADER_STYLE,
+    MONEY_STYLE,
+    QUANTITY_STYLE
+)
+
+
+SHEET_WRITER = os.environ.get("SLOTX_SHEET_WRITER", "openpyxl")
+
+SHEET_WRITERS = ["openpyxl", "xml"]
+
+# Styles the xml backend resolves up front (others on first use)
+STREAM_STYLES = [HEADER_STYLE, MONEY_STYLE, QUANTITY_STYLE]
+
+# Streamed rows stay in RAM up to this size, then spill to disk
+STREAM_SPOOL_BYTES = 16 * 1024 * 1024
+
+STREAM_FLUSH_ROWS = 1000
+
+# Rows turned into Python values at a time by column_rows
+ROW_CHUNK_ROWS = 5000
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+SHARED_STRINGS_TYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+)
+
+SHEET_DATA = re.compile(rb"<sheetData\s*/>|<sheetData>.*</sheetData>", re.S)
+DIMENSION = re.compile(rb"<dimension [^>]*/>")
+SHARED_INDEX = re.compile(rb'(t="s"><v>)(\d+)(</v>)')
+SST_COUNTS = re.compile(rb'\s(?:count|uniqueCount)="\d+"')
+
+# Streamed sheets + shared strings of each open workbook
+_streamed = weakref.WeakKeyDictionary()
+
+
+def column_rows(columns, chunk_rows=ROW_CHUNK_ROWS):
+    """
+    Row tuples across equal-length Series, converted to Python values
+    one chunk at a time — peak memory stays flat however long the
+    sheet is.
+    """
+
+    row_count = len(columns[0]) if columns else 0
+
+    for start in range(0, row_count, chunk_rows):
+        yield from zip(*[
+            column.iloc[start:start + chunk_rows].tolist()
+            for column in columns
+        ])
+
+
+def sheet_writer(wb, title, backend=None):
+    """
+    Writer for one new sheet of `wb`. Sheet builders append rows through
+    it instead of ws.append, so the same builder works on a normal or
+    write-only workbook, with openpyxl cells or streamed XML
+    (SLOTX_SHEET_WRITER):
+
+        writer.set_widths(widths)
+        writer.set_column_styles(styles)
+        writer.stripe_rows(ref)
+        writer.append(values, style=None, column_styles=None)
+
+    Column settings must come before the first append.
+    """
+
+    backend = backend or SHEET_WRITER
+
+    if backend == "openpyxl":
+        return OpenpyxlSheetWriter(wb, title)
+
+    if backend == "xml":
+        return XmlSheetWriter(wb, title)
+
+    raise ValueError(
+        f"Unknown sheet writer '{backend}' (expected one of {SHEET_WRITERS})"
+    )
+
+
+class _SheetWriter:
+    """
+    Sheet-level settings live on the openpyxl worksheet for both
+    backends.
+    """
+
+    def set_widths(self, widths):
+        set_column_widths(self.ws, widths)
+
+    def set_column_styles(self, styles):
+        set_column_styles(self.ws, styles)
+
+    def stripe_rows(self, ref):
+        stripe_rows(self.ws, ref)
+
+
+# =====================================================
+# OPENPYXL (default)
+# =====================================================
+
+class OpenpyxlSheetWriter(_SheetWriter):
+    """
+    Styled WriteOnlyCells appended to an openpyxl sheet — works on
+    normal and write-only workbooks.
+    """
+
+    def __init__(self, wb, title):
+        self.ws = wb.create_sheet(title)
+
+    def append(self, values, style=None, column_styles=None):
+        self.ws.append(styled_row(self.ws, values, style, column_styles))
+
+
+# =====================================================
+# STREAMING SPREADSHEETML
+# =====================================================
+
+class _StreamedParts:
+
+    def __init__(self):
+        self.sheets = {}
+        self.strings = {}
+
+
+class XmlSheetWriter(_SheetWriter):
+    """
+    openpyxl only gets an empty placeholder sheet (widths, column
+    styles, conditional formatting);
+    the rows are written as <sheetData> XML and swapped in by
+    save_workbook(). Strings go to one shared-strings table per
+    workbook, styles are the registered named styles' cell xfs.
+    """
+
+    def __init__(self, wb, title):
+
+        register_styles(wb)
+
+        self.ws = wb.create_sheet(title)
+        self.parts = _streamed.setdefault(wb, _StreamedParts())
+        self.parts.sheets[title] = self
+
+        self.spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_BYTES)
+        self.spool.write(b"<sheetData>")
+
+        self.pending = []
+        self.row_count = 0
+        self.column_count = 0
+        self.letters = []
+
+        self.style_ids = {None: 0}
+        for name in STREAM_STYLES:
+            self._style_id(name)
+
+    def _style_id(self, name):
+
+        if name not in self.style_ids:
+            # Registers the style's xf on the workbook, same index
+            # openpyxl would give a cell with this style
+            cell = WriteOnlyCell(self.ws)
+            cell.style = name
+            self.style_ids[name] = cell.style_id
+
+        return self.style_ids[name]
+
+    def _string_id(self, text):
+
+        strings = self.parts.strings
+        index = strings.get(text)
+
+        if index is None:
+            index = strings[text] = len(strings)
+
+        return index
+
+    def append(self, values, style=None, column_styles=None):
+
+        values = list(values)
+
+        if column_styles is None:
+            column_styles = [style] * len(values)
+
+        while len(self.letters) < len(values):
+            self.letters.append(get_column_letter(len(self.letters) + 1))
+
+        self.row_count += 1
+        row = str(self.row_count)
+
+        cells = []
+
+        for letter, value, cell_style in zip(self.letters, values, column_styles):
+
+            style_id = self.style_ids.get(cell_style)
+            if style_id is None:
+                style_id = self._style_id(cell_style)
+
+            cell = f'<c r="{letter}{row}"'
+            if style_id:
+                cell += f' s="{style_id}"'
+
+            if isinstance(value, str):
+                if value:
+                    cells.append(f'{cell} t="s"><v>{self._string_id(value)}</v></c>')
+                elif style_id:
+                    cells.append(cell + "/>")
+
+            elif isinstance(value, bool):
+                cells.append(f'{cell} t="b"><v>{int(value)}</v></c>')
+
+            elif isinstance(value, numbers.Integral):
+                cells.append(f"{cell}><v>{int(value)}</v></c>")
+
+            elif isinstance(value, numbers.Real):
+                value = float(value)
+
+                if math.isfinite(value):
+                    # Same precision openpyxl writes
+                    cells.append(f"{cell}><v>{value:.16g}</v></c>")
+                elif style_id:
+                    cells.append(cell + "/>")
+
+            elif value is None:
+                if style_id:
+                    cells.append(cell + "/>")
+
+            else:
+                cells.append(
+                    f'{cell} t="s"><v>{self._string_id(str(value))}</v></c>'
+                )
+
+        self.column_count = max(self.column_count, len(values))
+        self.pending.append(f'<row r="{row}">{"".join(cells)}</row>\n')
+
+        if len(self.pending) >= STREAM_FLUSH_ROWS:
+            self._flush()
+
+    def _flush(self):
+
+        self.spool.write("".join(self.pending).encode("utf-8"))
+        self.pending = []
+
+    def dimension(self):
+
+        if not self.row_count:
+            return "A1"
+
+        return f"A1:{get_column_letter(max(self.column_count, 1))}{self.row_count}"
+
+    def write_sheet(self, placeholder_xml, entry, string_offset):
+        """
+        Placeholder sheet XML with its <sheetData> replaced by the
+        streamed rows, written into an open archive entry.
+        """
+
+        self._flush()
+        self.spool.write(b"</sheetData>")
+
+        placeholder_xml = DIMENSION.sub(
+            f'<dimension ref="{self.dimension()}"/>'.encode(), placeholder_xml
+        )
+
+        match = SHEET_DATA.search(placeholder_xml)
+
+        entry.write(placeholder_xml[:match.start()])
+
+        self.spool.seek(0)
+
+        if string_offset:
+            for line in self.spool:
+                entry.write(SHARED_INDEX.sub(
+                    lambda m: m.group(1) + str(int(m.group(2)) + string_offset).encode() + m.group(3),
+                    line
+                ))
+        else:
+            shutil.copyfileobj(self.spool, entry)
+
+        entry.write(placeholder_xml[match.end():])
+
+        self.spool.close()
+
+
+def _xml_text(text):
+
+    text = escape(ILLEGAL_CHARACTERS_RE.sub("", text))
+
+    if text != text.strip():
+        return f'<t xml:space="preserve">{text}</t>'
+
+    return f"<t>{text}</t>"
+
+
+def _shared_strings_xml(existing, strings):
+    """
+    sharedStrings.xml: the package's own entries (if any) first, then
+    the streamed ones.
+    """
+
+    items = "".join(f"<si>{_xml_text(text)}</si>" for text in strings).encode("utf-8")
+
+    if existing is None:
+        return (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<sst xmlns="{SPREADSHEET_NS}" count="{len(strings)}" '
+            f'uniqueCount="{len(strings)}">'
+        ).encode("utf-8") + items + b"</sst>"
+
+    offset = existing.count(b"<si>") + existing.count(b"<si/>")
+    total = offset + len(strings)
+
+    open_end = existing.index(b">", existing.index(b"<sst")) + 1
+    close_start = existing.rindex(b"</sst>")
+
+    header = SST_COUNTS.sub(b"", existing[:open_end - 1])
+    header += f' count="{total}" uniqueCount="{total}">'.encode()
+
+    return header + existing[open_end:close_start] + items + b"</sst>"
+
+
+def _sheet_parts(package):
+    """
+    { sheet title: worksheet part name } from workbook.xml + its rels.
+    """
+
+    workbook = ElementTree.fromstring(package.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(package.read("xl/_rels/workbook.xml.rels"))
+
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in rels.iter(f"{{{PACKAGE_REL_NS}}}Relationship")
+    }
+
+    parts = {}
+
+    for sheet in workbook.iter(f"{{{SPREADSHEET_NS}}}sheet"):
+        target = targets[sheet.get(f"{{{DOC_REL_NS}}}id")].lstrip("/")
+        parts[sheet.get("name")] = target if target.startswith("xl/") else f"xl/{target}"
+
+    return parts
+
+
+def _add_shared_strings_part(name, data):
+    """
+    Content-type override / workbook relationship for a package that
+    had no sharedStrings.xml of its own.
+    """
+
+    if name == "[Content_Types].xml":
+        return data.replace(
+            b"</Types>",
+            f'<Override PartName="/{SHARED_STRINGS_PART}" '
+            f'ContentType="{SHARED_STRINGS_TYPE}"/></Types>'.encode()
+        )
+
+    if name == "xl/_rels/workbook.xml.rels":
+        return data.replace(
+            b"</Relationships>",
+            f'<Relationship Id="rIdSlotXStrings" '
+            f'Type="{DOC_REL_NS}/sharedStrings" '
+            f'Target="sharedStrings.xml"/></Relationships>'.encode()
+        )
+
+    return data
+
+
+def save_workbook(wb, target):
+    """
+    wb.save(target), with any streamed (xml backend) sheets spliced in.
+    target: path or writable binary file.
+    """
+
+    parts = _streamed.pop(wb, None)
+
+    if parts is None:
+        wb.save(target)
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_BYTES) as saved:
+
+        wb.save(saved)
+        saved.seek(0)
+
+        with zipfile.ZipFile(saved) as package, \
+                zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as output:
+
+            sheet_parts = _sheet_parts(package)
+            streamed_parts = {
+                sheet_parts[title]: sheet for title, sheet in parts.sheets.items()
+            }
+
+            names = package.namelist()
+            existing_strings = (
+                package.read(SHARED_STRINGS_PART)
+                if SHARED_STRINGS_PART in names else None
+            )
+            string_offset = 0
+
+            if existing_strings is not None:
+                string_offset = (
+                    existing_strings.count(b"<si>") + existing_strings.count(b"<si/>")
+                )
+
+            for name in names:
+
+                if name in streamed_parts:
+                    with output.open(name, "w", force_zip64=True) as entry:
+                        streamed_parts[name].write_sheet(
+                            package.read(name), entry, string_offset
+                        )
+                    continue
+
+                if name == SHARED_STRINGS_PART:
+                    continue
+
+                data = package.read(name)
+
+                if existing_strings is None:
+                    data = _add_shared_strings_part(name, data)
+
+                output.writestr(name, data)
+
+            output.writestr(
+                SHARED_STRINGS_PART,
+                _shared_strings_xml(existing_strings, list(parts.strings))
+            )
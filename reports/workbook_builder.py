@@ -1,10 +1,10 @@
-from openpyxl import Workbook
 from io import BytesIO
 
 from reports.sales_sheet import create_sales_sheet
 from reports.inventory_sheet import create_inventory_sheet
 from reports.report_sheet import create_report_sheet
-from reports.metadata_sheet import create_metadata_sheet
+from reports.workbook_template import brand_workbook_skeleton, finish_skeleton
+from reports.sheet_writers import save_workbook
 
 
 def build_brand_workbook(
@@ -13,14 +13,13 @@ def build_brand_workbook(
     payout_cycle,
     brand_sales,
     brand_inventory,
-    deals_dict
+    deals_dict,
+    kpis=None,
+    generated_at=None
 ):
 
-    wb = Workbook()
-
-    # Remove default sheet
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
+    # Styles + Metadata sheet come prebuilt from the run's skeleton
+    wb = brand_workbook_skeleton(mode, payout_cycle, generated_at)
 
     # ============================
     # SALES SHEET
@@ -53,26 +52,22 @@ def build_brand_workbook(
         payout_cycle=payout_cycle,
         brand_sales=brand_sales,
         brand_inventory=brand_inventory,
-        deals_dict=deals_dict
+        deals_dict=deals_dict,
+        kpis=kpis
     )
 
     # ============================
-    # METADATA SHEET
+    # METADATA SHEET (last tab)
     # ============================
 
-    create_metadata_sheet(
-        wb,
-        f"{brand_name} Report",
-        mode,
-        payout_cycle
-    )
+    finish_skeleton(wb)
 
     # ============================
     # RETURN BUFFER
     # ============================
 
     buffer = BytesIO()
-    wb.save(buffer)
+    save_workbook(wb, buffer)
     buffer.seek(0)
 
     return buffer
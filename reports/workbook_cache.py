@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from reports.sheet_writers import SHEET_WRITER
+from utils.disk_cache import cache_dir, touch, evict_to_size, write_entry
+
+
+WORKBOOK_CACHE_MAX_BYTES = int(
+    os.environ.get("SLOTX_WORKBOOK_CACHE_MAX_BYTES", 1024 ** 3)
+)
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source files whose code shapes a brand workbook — build_brand_workbook
+# and every module it imports, directly or not, that affects the output
+REPORT_CODE_FILES = [
+    "reports/workbook_builder.py",
+    "reports/sales_sheet.py",
+    "reports/inventory_sheet.py",
+    "reports/report_sheet.py",
+    "reports/metadata_sheet.py",
+    "reports/workbook_template.py",
+    "reports/sheet_writers.py",
+    "utils/excel_helpers.py",
+    "core/kpi_engine.py",
+    "core/deals_engine.py",
+]
+
+
+def _report_code_version() -> str:
+    """
+    Digest of the report code itself — any edit invalidates the cache.
+    """
+
+    digest = hashlib.sha256()
+
+    for relative_path in REPORT_CODE_FILES:
+        with open(os.path.join(PACKAGE_ROOT, relative_path), "rb") as handle:
+            digest.update(handle.read())
+
+    return digest.hexdigest()
+
+
+REPORT_CODE_VERSION = _report_code_version()
+
+
+def _update_with_frame(digest, df: pd.DataFrame):
+
+    digest.update(json.dumps(
+        [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    ).encode())
+
+    digest.update(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+    )
+
+
+def workbook_cache_key(job_kwargs: dict) -> str:
+    """
+    Hash of everything a brand workbook is built from:
+    sales rows, inventory rows, deal, payout cycle, mode, report code,
+    sheet writer backend.
+    """
+
+    digest = hashlib.sha256(REPORT_CODE_VERSION.encode())
+
+    digest.update(json.dumps(
+        [
+            str(job_kwargs["brand_name"]),
+            str(job_kwargs["mode"]),
+            str(job_kwargs["payout_cycle"]),
+            job_kwargs["deals_dict"],
+            SHEET_WRITER
+        ],
+        sort_keys=True,
+        default=str
+    ).encode())
+
+    _update_with_frame(digest, job_kwargs["brand_sales"])
+    _update_with_frame(digest, job_kwargs["brand_inventory"])
+
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> str:
+
+    return os.path.join(cache_dir("workbooks"), f"{key}.xlsx")
+
+
+def load_cached_workbook(key: str):
+    """
+    Cached xlsx bytes, or None.
+    """
+
+    path = _entry_path(key)
+
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return None
+
+    touch(path)
+
+    return data
+
+
+def store_cached_workbook(key: str, data: bytes):
+
+    try:
+        write_entry(_entry_path(key), lambda handle: handle.write(data))
+    except OSError:
+        pass
+
+
+def evict_workbook_cache():
+
+    evict_to_size(cache_dir("workbooks"), WORKBOOK_CACHE_MAX_BYTES)
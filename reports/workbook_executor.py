@@ -0,0 +1,133 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from reports.workbook_builder import build_brand_workbook
+from reports.workbook_cache import (
+    workbook_cache_key,
+    load_cached_workbook,
+    store_cached_workbook,
+    evict_workbook_cache
+)
+
+
+# Jobs queued per worker — keeps pickled brand slices bounded in memory
+JOBS_PER_WORKER = 4
+
+
+def _build_brand_bytes(job_kwargs):
+
+    # Timed inside the worker so pool queueing is not counted
+    start = time.perf_counter()
+    workbook_bytes = build_brand_workbook(**job_kwargs).getvalue()
+
+    return workbook_bytes, time.perf_counter() - start
+
+
+def _job_rows(job_kwargs):
+
+    return len(job_kwargs["brand_sales"]) + len(job_kwargs["brand_inventory"])
+
+
+def build_brand_workbooks(jobs, max_workers=1, use_cache=True, metrics=None):
+    """
+    Build brand workbooks serially or over a process pool.
+
+    jobs:
+        [ (file_path, build_brand_workbook kwargs), ... ]
+
+    Yields (file_path, xlsx bytes) as each workbook finishes.
+    max_workers <= 1 runs everything in the current process.
+
+    With use_cache, brands whose inputs are unchanged since an earlier
+    run are served from the on-disk workbook cache; only the rest are
+    rebuilt.
+
+    metrics (core.run_metrics.RunMetrics) receives build time, input
+    rows and output bytes of every brand.
+    """
+
+    to_build = []
+
+    for file_path, job_kwargs in jobs:
+
+        if not use_cache:
+            to_build.append((file_path, job_kwargs, None))
+            continue
+
+        cache_key = workbook_cache_key(job_kwargs)
+        cached = load_cached_workbook(cache_key)
+
+        if cached is not None:
+            if metrics is not None:
+                metrics.record_brand(
+                    file_path, 0.0, _job_rows(job_kwargs), len(cached), cached=True
+                )
+            yield file_path, cached
+        else:
+            to_build.append((file_path, job_kwargs, cache_key))
+
+    for file_path, job_rows, cache_key, (workbook_bytes, seconds) in _run_builds(
+        to_build, max_workers
+    ):
+
+        if metrics is not None:
+            metrics.record_brand(file_path, seconds, job_rows, len(workbook_bytes))
+
+        if cache_key is not None:
+            store_cached_workbook(cache_key, workbook_bytes)
+
+        yield file_path, workbook_bytes
+
+    if use_cache:
+        evict_workbook_cache()
+
+
+def _run_builds(to_build, max_workers):
+
+    if max_workers <= 1 or len(to_build) <= 1:
+        for file_path, job_kwargs, cache_key in to_build:
+            yield (
+                file_path,
+                _job_rows(job_kwargs),
+                cache_key,
+                _build_brand_bytes(job_kwargs)
+            )
+        return
+
+    pending_jobs = iter(to_build)
+    in_flight = {}
+
+    # spawn, not fork: the pool is started from a job thread of the app
+    # server, and forking there would copy locks other threads hold
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+
+        def submit_next():
+            job = next(pending_jobs, None)
+            if job is None:
+                return False
+            file_path, job_kwargs, cache_key = job
+            future = executor.submit(_build_brand_bytes, job_kwargs)
+            in_flight[future] = (file_path, _job_rows(job_kwargs), cache_key)
+            return True
+
+        for _ in range(max_workers * JOBS_PER_WORKER):
+            if not submit_next():
+                break
+
+        try:
+            while in_flight:
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    file_path, job_rows, cache_key = in_flight.pop(future)
+                    yield file_path, job_rows, cache_key, future.result()
+                    submit_next()
+        finally:
+            # Consumer stopped early (cancelled run): drop queued builds,
+            # only wait for the ones already running
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,80 @@
+import pickle
+import threading
+from collections import OrderedDict
+
+from openpyxl import Workbook
+
+from reports.metadata_sheet import create_metadata_sheet, generated_at_now
+from utils.excel_helpers import register_styles
+
+
+# Rendered skeletons kept per process (one per mode / cycle / run)
+SKELETON_CACHE_SIZE = 8
+
+_skeletons = OrderedDict()
+
+# Serial builds run on the background job threads, which share the cache
+_skeletons_lock = threading.Lock()
+
+
+def _render_skeleton(mode, payout_cycle, generated_at):
+
+    wb = Workbook()
+
+    # Remove default sheet
+    if "Sheet" in wb.sheetnames:
+        wb.remove(wb["Sheet"])
+
+    # Shared named styles — registered once, referenced by every sheet
+    register_styles(wb)
+
+    # Only branch, cycle and timestamp vary — identical for every
+    # brand of a run
+    create_metadata_sheet(wb, "Brand Report", mode, payout_cycle, generated_at)
+
+    return pickle.dumps(wb, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def brand_workbook_skeleton(mode, payout_cycle, generated_at=None):
+    """
+    Fresh Workbook with the named styles registered and the Metadata
+    sheet already filled in.
+
+    The skeleton is rendered once per (mode, cycle, generated_at) and
+    every call returns an independent copy of it — far cheaper than
+    registering styles and drawing the Metadata sheet per brand.
+    Call finish_skeleton() once the data sheets are added.
+    """
+
+    if generated_at is None:
+        generated_at = generated_at_now()
+
+    key = (mode, payout_cycle, generated_at)
+
+    with _skeletons_lock:
+        skeleton = _skeletons.get(key)
+
+        if skeleton is not None:
+            _skeletons.move_to_end(key)
+
+    if skeleton is None:
+        skeleton = _render_skeleton(mode, payout_cycle, generated_at)
+
+        with _skeletons_lock:
+            _skeletons[key] = skeleton
+
+            while len(_skeletons) > SKELETON_CACHE_SIZE:
+                _skeletons.popitem(last=False)
+
+    return pickle.loads(skeleton)
+
+
+def finish_skeleton(wb):
+    """
+    Move the prebuilt Metadata sheet back behind the data sheets.
+    """
+
+    metadata = wb["Metadata"]
+
+    wb.move_sheet(metadata, offset=len(wb.sheetnames) - 1 - wb.index(metadata))
+    wb.active = 0
@@ -0,0 +1,175 @@
+# tests/test_refund_engine.py
+#
+# clean_refunds against the original row-by-row matcher it replaced.
+#
+#   python -m pytest -q tests
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.refund_engine import clean_refunds
+
+
+def reference_clean(sales_df):
+    """
+    The original loop: each refund, in file order, removes the first
+    not-yet-removed sale with the same brand, barcode and |quantity|.
+    """
+
+    removed = set(sales_df.index[sales_df["quantity"] < 0])
+
+    for _, refund in sales_df[sales_df["quantity"] < 0].iterrows():
+
+        same_key = (
+            (sales_df["barcode"] == refund["barcode"]) &
+            (sales_df["quantity"] == abs(refund["quantity"])) &
+            ~sales_df.index.isin(removed)
+        )
+
+        if "brand" in sales_df.columns:
+            same_key &= sales_df["brand"] == refund["brand"]
+
+        matching = sales_df.index[same_key]
+
+        if len(matching):
+            removed.add(matching[0])
+
+    return sales_df[~sales_df.index.isin(removed)]
+
+
+def sales(rows, columns=("brand", "barcode", "quantity", "total")):
+
+    return pd.DataFrame(rows, columns=list(columns))
+
+
+def assert_matches_reference(sales_df):
+
+    cleaned, stats = clean_refunds(sales_df)
+    expected = reference_clean(sales_df)
+
+    pd.testing.assert_frame_equal(cleaned, expected)
+
+    assert stats["removed_total_count"] == len(sales_df) - len(expected)
+    assert stats["refund_count"] == int((sales_df["quantity"] < 0).sum())
+    assert stats["matched_count"] + stats["unmatched_count"] == stats["refund_count"]
+
+    return cleaned, stats
+
+
+def test_duplicate_refunds_take_sales_in_file_order():
+
+    sales_df = sales([
+        ["A", "111", 1, 100.0],
+        ["A", "111", 1, 100.0],
+        ["A", "111", 1, 100.0],
+        ["A", "111", -1, -100.0],
+        ["A", "111", -1, -100.0],
+    ])
+
+    cleaned, stats = assert_matches_reference(sales_df)
+
+    assert cleaned.index.tolist() == [2]
+    assert stats["matched_count"] == 2
+
+
+def test_partial_quantity_refund_does_not_match():
+
+    sales_df = sales([
+        ["A", "111", 3, 300.0],
+        ["A", "111", -1, -100.0],
+    ])
+
+    cleaned, stats = assert_matches_reference(sales_df)
+
+    assert cleaned.index.tolist() == [0]
+    assert stats["unmatched_count"] == 1
+
+
+def test_unmatched_refund_is_still_removed():
+
+    sales_df = sales([
+        ["A", "111", 1, 100.0],
+        ["B", "111", -1, -100.0],
+        ["A", "222", -1, -100.0],
+    ])
+
+    cleaned, stats = assert_matches_reference(sales_df)
+
+    assert cleaned.index.tolist() == [0]
+    assert stats == {
+        "refund_count": 2,
+        "matched_count": 0,
+        "unmatched_count": 2,
+        "removed_total_count": 2
+    }
+
+
+def test_missing_brand_matches_on_barcode_and_quantity():
+
+    sales_df = sales(
+        [
+            ["111", 2, 200.0],
+            ["222", 2, 200.0],
+            ["111", -2, -200.0],
+        ],
+        columns=("barcode", "quantity", "total")
+    )
+
+    cleaned, stats = assert_matches_reference(sales_df)
+
+    assert cleaned.index.tolist() == [1]
+    assert stats["matched_count"] == 1
+
+
+def test_missing_barcode_or_quantity_leaves_frame_unchanged():
+
+    sales_df = sales([["A", 1, 100.0], ["A", -1, -100.0]],
+                     columns=("brand", "quantity", "total"))
+
+    cleaned, stats = clean_refunds(sales_df)
+
+    pd.testing.assert_frame_equal(cleaned, sales_df)
+    assert stats["refund_count"] == 0
+
+
+def test_downcast_quantities():
+
+    # int8 / int16 as produced by ingest's downcast
+    sales_df = sales([
+        ["A", "111", 127, 100.0],
+        ["A", "111", -128, -100.0],
+    ])
+    sales_df["quantity"] = sales_df["quantity"].astype("int8")
+
+    cleaned, stats = clean_refunds(sales_df)
+
+    assert cleaned.index.tolist() == [0]
+    assert stats["unmatched_count"] == 1
+
+    sales_df = sales([
+        ["A", "111", 128, 100.0],
+        ["A", "111", -128, -100.0],
+    ])
+    sales_df["quantity"] = sales_df["quantity"].astype("int16")
+
+    cleaned, stats = assert_matches_reference(sales_df)
+
+    assert cleaned.empty
+    assert stats["matched_count"] == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_exports_match_reference(seed):
+
+    rng = np.random.default_rng(seed)
+    row_count = 400
+
+    sales_df = pd.DataFrame({
+        "brand": rng.choice(["A", "B", "C"], row_count),
+        "barcode": rng.choice(["111", "222", "333", None], row_count),
+        "quantity": rng.choice([-3, -2, -1, 1, 2, 3], row_count),
+        "total": rng.random(row_count)
+    })
+
+    assert_matches_reference(sales_df)
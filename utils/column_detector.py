@@ -11,17 +11,20 @@ def normalize_column_name(col_name: str) -> str:
     return col
 
 
-def detect_columns(df, file_type: str):
+def resolve_columns(columns, file_type: str) -> dict:
     """
-    Detect and standardize required columns dynamically.
-    
-    file_type: "sales" or "inventory"
+    Match export column names (e.g. a header row) to the names the
+    reports use.
+
+    Returns { export column: report column } for every column found;
+    raises ValueError when a required one has no match.
     """
 
-    normalized_map = {
-        normalize_column_name(col): col
-        for col in df.columns
-    }
+    normalized_map = {}
+
+    for col in columns:
+        # First spelling wins if two headers normalize alike
+        normalized_map.setdefault(normalize_column_name(col), col)
 
     # Define expected aliases
     expected_columns = get_expected_columns(file_type)
@@ -30,37 +33,40 @@ def detect_columns(df, file_type: str):
 
     for standard_name, aliases in expected_columns.items():
         for alias in aliases:
-            normalized_alias = normalize_column_name(alias)
-            if normalized_alias in normalized_map:
-                final_mapping[normalized_map[normalized_alias]] = standard_name
+            source = normalized_map.get(normalize_column_name(alias))
+            if source is not None and source not in final_mapping:
+                final_mapping[source] = standard_name
                 break
 
-    # Rename detected columns
-    df = df.rename(columns=final_mapping)
-
     # Validate required columns
+    found = set(final_mapping.values())
     missing = [
-        col for col in expected_columns.keys()
-        if col not in df.columns
+        col for col in get_required_columns(file_type)
+        if col not in found
     ]
 
     if missing:
+        expected = "; ".join(
+            f"{col}: {', '.join(expected_columns[col])}" for col in missing
+        )
         raise ValueError(
-            f"Missing required columns in {file_type} file: {missing}"
+            f"Missing required columns in {file_type} file: {missing} "
+            f"(accepted names — {expected})"
         )
 
-    return df
+    return final_mapping
 
 
 def get_expected_columns(file_type: str):
     """
-    Define expected column aliases.
+    Define expected column aliases, keyed by the name the reports use.
     """
 
     if file_type == "sales":
         return {
             "brand": ["brand", "brand_name"],
-            "product_name": ["product_name", "name_ar", "product"],
+            "name_ar": ["name_ar", "product_name", "product"],
+            "name_en": ["name_en", "product_name_en"],
             "barcode": ["barcode", "barcodes"],
             "quantity": ["quantity", "qty"],
             "total": ["total", "total_price", "amount"],
@@ -69,11 +75,27 @@ def get_expected_columns(file_type: str):
     elif file_type == "inventory":
         return {
             "brand": ["brand", "brand_name"],
-            "product_name": ["product_name", "name_en", "product"],
-            "barcode": ["barcode", "barcodes"],
-            "unit_price": ["unit_price", "sale_price", "price"],
+            "name_en": ["name_en", "product_name", "product"],
+            "barcodes": ["barcodes", "barcode"],
+            "sale_price": ["sale_price", "unit_price", "price"],
             "available_quantity": ["available_quantity", "qty", "stock"],
         }
 
     else:
         raise ValueError("Invalid file type for column detection.")
+
+
+def get_required_columns(file_type: str):
+    """
+    Columns a run can't do without — the product name / barcode columns
+    are optional (sheets leave them blank).
+    """
+
+    if file_type == "sales":
+        return ["brand", "quantity", "total"]
+
+    elif file_type == "inventory":
+        return ["brand", "sale_price", "available_quantity"]
+
+    else:
+        raise ValueError("Invalid file type for column detection.")
@@ -0,0 +1,87 @@
+# utils/disk_cache.py
+
+import os
+import tempfile
+
+
+# Root for every on-disk cache (override with SLOTX_CACHE_DIR)
+CACHE_ROOT = os.environ.get(
+    "SLOTX_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "slotx_cache")
+)
+
+
+def cache_dir(name: str) -> str:
+
+    path = os.path.join(CACHE_ROOT, name)
+    os.makedirs(path, exist_ok=True)
+
+    return path
+
+
+def touch(path: str):
+    """
+    Mark a cache entry as recently used (eviction is by mtime).
+    """
+
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def evict_to_size(directory: str, max_bytes: int):
+    """
+    Delete least-recently-used files until the directory
+    fits in max_bytes.
+    """
+
+    entries = []
+
+    for entry in os.scandir(directory):
+        # Another job may rename / evict an entry while we scan
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            continue
+
+    total_bytes = sum(size for _, size, _ in entries)
+
+    for _, size, path in sorted(entries):
+
+        if total_bytes <= max_bytes:
+            break
+
+        try:
+            os.remove(path)
+            total_bytes -= size
+        except OSError:
+            pass
+
+
+def write_entry(path: str, write):
+    """
+    Write a cache entry atomically: write(handle) fills a temp file
+    unique to this call, which is then renamed onto `path`. Concurrent
+    jobs writing the same entry never share a partial file.
+    """
+
+    handle = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path),
+        prefix=f"{os.path.basename(path)}.",
+        suffix=".partial",
+        delete=False
+    )
+
+    try:
+        with handle:
+            write(handle)
+        os.replace(handle.name, path)
+    except BaseException:
+        try:
+            os.remove(handle.name)
+        except OSError:
+            pass
+        raise
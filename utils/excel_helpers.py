@@ -1,10 +1,103 @@
 # utils/excel_helpers.py
 
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from copy import copy
+
+from openpyxl.styles import PatternFill, Font, Alignment, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.formatting.rule import FormulaRule
+
+
+# =====================================================
+# SHARED STYLE REGISTRY
+# =====================================================
+
+HEADER_STYLE = "SlotX Header"
+MONEY_STYLE = "SlotX Money"
+QUANTITY_STYLE = "SlotX Quantity"
+KPI_STYLE = "SlotX KPI"
+KPI_MONEY_STYLE = "SlotX KPI Money"
+LABEL_STYLE = "SlotX Label"
+BANNER_STYLE = "SlotX Banner"
+TITLE_STYLE = "SlotX Title"
+
+BRAND_BLUE = "0A1F5C"
+STRIPE_COLOR = "E9EEF7"
+
+MONEY_FORMAT = '#,##0.00 "EGP"'
+QUANTITY_FORMAT = '#,##0'
+
+# Number format each column-level style stands for
+STYLE_NUMBER_FORMATS = {
+    MONEY_STYLE: MONEY_FORMAT,
+    QUANTITY_STYLE: QUANTITY_FORMAT
+}
+
+
+def _solid_fill(color):
+
+    return PatternFill(
+        start_color=color,
+        end_color=color,
+        fill_type="solid"
+    )
+
+
+def _build_named_styles():
+    """
+    Fresh NamedStyle objects — a NamedStyle binds to ONE workbook.
+    """
+
+    blue_fill = _solid_fill(BRAND_BLUE)
+    white_bold = Font(bold=True, color="FFFFFF")
+    center = Alignment(horizontal="center")
+
+    def plain_font():
+        # Same font unstyled cells get, so only fill/format changes
+        return copy(DEFAULT_FONT)
+
+    return [
+        NamedStyle(HEADER_STYLE, fill=blue_fill, font=white_bold, alignment=center),
+        NamedStyle(MONEY_STYLE, font=plain_font(), number_format=MONEY_FORMAT),
+        NamedStyle(QUANTITY_STYLE, font=plain_font(), number_format=QUANTITY_FORMAT),
+        NamedStyle(KPI_STYLE, fill=blue_fill, font=white_bold, alignment=center),
+        NamedStyle(
+            KPI_MONEY_STYLE,
+            fill=blue_fill,
+            font=white_bold,
+            alignment=center,
+            number_format=MONEY_FORMAT
+        ),
+        NamedStyle(LABEL_STYLE, font=Font(bold=True)),
+        NamedStyle(BANNER_STYLE, fill=blue_fill, font=plain_font()),
+        NamedStyle(
+            TITLE_STYLE,
+            fill=blue_fill,
+            font=Font(name="Arial Black", size=40, bold=True, color="FFFFFF"),
+            alignment=Alignment(horizontal="center", vertical="center")
+        ),
+    ]
+
+
+def register_styles(wb):
+    """
+    Register the shared named styles on a workbook (once — safe to call
+    again). Cells then only reference a style by name.
+    """
+
+    registered = set(wb.named_styles)
+
+    for style in _build_named_styles():
+        if style.name not in registered:
+            wb.add_named_style(style)
 
 
 def auto_fit_columns(ws):
+    """
+    Fallback that walks every cell. Sheet builders should prefer
+    widths_from_columns / widths_from_frame + set_column_widths.
+    """
     for column in ws.columns:
         max_length = 0
         column_letter = get_column_letter(column[0].column)
@@ -18,54 +111,125 @@ def auto_fit_columns(ws):
             except:
                 pass
 
-        adjusted_width = max(12, min(max_length + 3, 50))
-        ws.column_dimensions[column_letter].width = adjusted_width
+        ws.column_dimensions[column_letter].width = fit_width(max_length)
 
 
-def apply_header_style(ws):
+def fit_width(max_length):
 
-    header_fill = PatternFill(
-        start_color="1F4E78",
-        end_color="1F4E78",
-        fill_type="solid"
-    )
+    return max(12, min(max_length + 3, 50))
 
-    header_font = Font(
-        bold=True,
-        color="FFFFFF"
-    )
 
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+# Distinct values measured per column before sampling kicks in
+WIDTH_SAMPLE_ROWS = 100_000
 
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin_border
 
-    ws.freeze_panes = "A2"
+def widths_from_columns(headers, columns, sample_rows=WIDTH_SAMPLE_ROWS):
+    """
+    Auto-fit widths from the header text and the source column values,
+    without walking worksheet cells. Needed for write-only sheets,
+    where widths must be set before the first row is streamed.
 
+    Lengths are measured vectorized on distinct values only; very
+    high-cardinality columns are measured on a bounded sample.
 
-def get_status_fill(status):
+    columns: one pandas Series (or None) per header
+    """
 
-    colors = {
-        "Critical": "FF4C4C",
-        "Low": "FFA500",
-        "Medium": "FFD966",
-        "Good": "2E7D32"
-    }
+    widths = []
 
-    return PatternFill(
-        start_color=colors.get(status, "FFFFFF"),
-        end_color=colors.get(status, "FFFFFF"),
-        fill_type="solid"
+    for header, values in zip(headers, columns):
+
+        max_length = len(str(header))
+
+        if values is not None:
+            values = values.dropna().drop_duplicates()
+
+            if len(values) > sample_rows:
+                values = values.sample(sample_rows, random_state=0)
+
+            values = values[values.astype(bool)]
+
+            if not values.empty:
+                max_length = max(
+                    max_length,
+                    int(values.astype(str).str.len().max())
+                )
+
+        widths.append(fit_width(max_length))
+
+    return widths
+
+
+def widths_from_frame(frame, headers=None, sample_rows=WIDTH_SAMPLE_ROWS):
+    """
+    Widths for every column of a DataFrame, in column order.
+    headers default to the frame's column names.
+    """
+
+    if headers is None:
+        headers = list(frame.columns)
+
+    return widths_from_columns(
+        headers,
+        [frame.iloc[:, i] for i in range(frame.shape[1])],
+        sample_rows
     )
 
 
-def format_money_cell(cell):
-    cell.number_format = '#,##0.00'
+def set_column_widths(ws, widths):
+
+    for col_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+
+def set_column_styles(ws, styles):
+    """
+    Number format of each column's named style (None = none), set once
+    on the column itself so it also covers cells typed in later.
+    Written cells still reference the style — Excel only applies a
+    column's format to cells that have none of their own.
+    """
+
+    for col_idx, style in enumerate(styles, 1):
+        if style in STYLE_NUMBER_FORMATS:
+            ws.column_dimensions[get_column_letter(col_idx)].number_format = (
+                STYLE_NUMBER_FORMATS[style]
+            )
+
+
+def stripe_rows(ws, ref):
+    """
+    Zebra striping (even rows) of `ref` with ONE conditional-formatting
+    rule instead of a stripe style on every cell.
+    """
+
+    ws.conditional_formatting.add(ref, FormulaRule(
+        formula=["MOD(ROW(),2)=0"],
+        fill=_solid_fill(STRIPE_COLOR)
+    ))
+
+
+def styled_row(ws, values, style=None, column_styles=None):
+    """
+    Build one row of cells ready for ws.append(), each referencing a
+    registered named style (see register_styles).
+    Works for normal and write-only (streaming) worksheets.
+
+    style: one style name for the whole row
+    column_styles: one style name (or None) per cell
+    """
+
+    if column_styles is None:
+        column_styles = [style] * len(values)
+
+    cells = []
+
+    for value, cell_style in zip(values, column_styles):
+        cell = WriteOnlyCell(ws, value=value)
+
+        if cell_style:
+            cell.style = cell_style
+
+        cells.append(cell)
+
+    return cells
@@ -0,0 +1,29 @@
+# utils/file_helpers.py
+
+import hashlib
+import os
+
+
+def read_file_bytes(file) -> bytes:
+    """
+    Raw bytes of an upload (Streamlit UploadedFile / file object)
+    or of a path on disk. File objects are rewound afterwards.
+    """
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as handle:
+            return handle.read()
+
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+
+    position = file.tell()
+    data = file.read()
+    file.seek(position)
+
+    return data
+
+
+def content_hash(data: bytes) -> str:
+
+    return hashlib.sha256(data).hexdigest()